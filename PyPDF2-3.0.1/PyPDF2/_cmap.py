@@ -1,17 +1,27 @@
 import warnings
 from binascii import unhexlify
+from functools import lru_cache
 from math import ceil
-from typing import Any, Dict, List, Tuple, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 from ._codecs import adobe_glyphs, charset_encoding
 from ._utils import logger_warning
 from .errors import PdfReadWarning
-from .generic import DecodedStreamObject, DictionaryObject, StreamObject
+from .generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    StreamObject,
+)
 
 
 # code freely inspired from @twiggy ; see #711
 def build_char_map(
-    font_name: str, space_width: float, obj: DictionaryObject
+    font_name: str,
+    space_width: float,
+    obj: DictionaryObject,
+    char_map_cache: Optional[Dict[Tuple[int, int, float], Tuple]] = None,
 ) -> Tuple[
     str, float, Union[str, Dict[int, str]], Dict, DictionaryObject
 ]:  # font_type,space_width /2, encoding, cmap
@@ -19,8 +29,73 @@ def build_char_map(
 
     This function returns a tuple consisting of:
     font sub-type, space_width/2, encoding, map character-map, font-dictionary.
-    The font-dictionary itself is suitable for the curious."""
-    ft: DictionaryObject = obj["/Resources"]["/Font"][font_name]  # type: ignore
+    The font-dictionary itself is suitable for the curious.
+
+    Fonts are usually shared by many pages. When a *char_map_cache* is
+    given (PdfReader keeps one per document), the result for a font that is
+    an indirect object is stored under the font's reference, so its
+    /Encoding and /ToUnicode are only parsed once per document.
+    Unembedded standard fonts are also shared across documents.
+    """
+    resources = cast(DictionaryObject, obj["/Resources"])
+    fonts = cast(DictionaryObject, resources["/Font"])
+    ft: DictionaryObject = fonts[font_name]  # type: ignore
+    key = None
+    if char_map_cache is not None:
+        ref = fonts.raw_get(font_name)
+        if isinstance(ref, IndirectObject):
+            key = (ref.idnum, ref.generation, space_width)
+            if key in char_map_cache:
+                return char_map_cache[key]
+    standard_font = _standard_font_key(ft)
+    if standard_font is not None:
+        char_map = _build_standard_char_map(*standard_font, space_width) + (ft,)
+    else:
+        char_map = _build_char_map_from_dict(ft, space_width)
+    if key is not None:
+        char_map_cache[key] = char_map  # type: ignore
+    return char_map  # type: ignore
+
+
+# entries a font dictionary may have while its char map only depends on their values
+_STANDARD_FONT_KEYS = frozenset(("/Type", "/Subtype", "/BaseFont", "/Encoding", "/Name"))
+
+
+def _standard_font_key(ft: DictionaryObject) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    Return (subtype, base font, encoding name) for an unembedded standard font.
+
+    Those fonts carry no /Widths, /ToUnicode or /Differences, so their char
+    map is the same in every document. Any other font returns None.
+    """
+    if "/Subtype" not in ft or not _STANDARD_FONT_KEYS.issuperset(ft.keys()):
+        return None
+    base_font = ft.get("/BaseFont")
+    if base_font not in _default_fonts_space_width:
+        return None
+    encoding = ft.get("/Encoding")
+    if encoding is not None:
+        encoding = encoding.get_object()
+        if not isinstance(encoding, NameObject):
+            return None
+    return cast(str, ft["/Subtype"]), base_font, encoding
+
+
+@lru_cache(maxsize=64)
+def _build_standard_char_map(
+    font_type: str, base_font: str, encoding: Optional[str], space_width: float
+) -> Tuple[str, float, Union[str, Dict[int, str]], Dict]:
+    ft = DictionaryObject(
+        {NameObject("/Subtype"): NameObject(font_type), NameObject("/BaseFont"): NameObject(base_font)}
+    )
+    if encoding is not None:
+        ft[NameObject("/Encoding")] = NameObject(encoding)
+    return _build_char_map_from_dict(ft, space_width)[:4]
+
+
+def _build_char_map_from_dict(
+    ft: DictionaryObject, space_width: float
+) -> Tuple[str, float, Union[str, Dict[int, str]], Dict, DictionaryObject]:
     font_type: str = cast(str, ft["/Subtype"])
 
     space_code = 32
@@ -80,6 +80,128 @@ CUSTOM_RTL_MIN: int = -1
 CUSTOM_RTL_MAX: int = -1
 CUSTOM_RTL_SPECIAL_CHARS: List[int] = []
 
+# operators _extract_text acts on; the operands of any other operator are not needed
+_TEXT_OPERATORS = frozenset(
+    (
+        b"BT",
+        b"ET",
+        b"q",
+        b"Q",
+        b"cm",
+        b"Tz",
+        b"Tw",
+        b"TL",
+        b"Tf",
+        b"Td",
+        b"TD",
+        b"Tm",
+        b"T*",
+        b"Tj",
+        b"TJ",
+        b"'",
+        b'"',
+        b"Do",
+    )
+)
+
+# affine matrices are handled as (a, b, c, d, e, f) tuples in text extraction
+_Matrix = Tuple[float, float, float, float, float, float]
+_IDENTITY_MATRIX: _Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _mult(m: _Matrix, n: _Matrix) -> _Matrix:
+    m0, m1, m2, m3, m4, m5 = m
+    n0, n1, n2, n3, n4, n5 = n
+    return (
+        m0 * n0 + m1 * n2,
+        m0 * n1 + m1 * n3,
+        m2 * n0 + m3 * n2,
+        m2 * n1 + m3 * n3,
+        m4 * n0 + m5 * n2 + n4,
+        m4 * n1 + m5 * n3 + n5,
+    )
+
+
+def _orient(m: _Matrix) -> int:
+    if m[3] > 1e-6:
+        return 0
+    elif m[3] < -1e-6:
+        return 180
+    elif m[1] > 0:
+        return 90
+    else:
+        return 270
+
+
+class _TextState:
+    """
+    The graphics and text state followed while extracting the text of a page.
+
+    Matrices are never changed in place but replaced by new tuples, so the
+    product of the text matrix and the current transformation matrix is only
+    computed again when one of them was replaced.
+    """
+
+    __slots__ = (
+        "cm_matrix",
+        "cm_stack",
+        "tm_matrix",
+        "tm_prev",
+        "char_scale",
+        "space_scale",
+        "space_width",
+        "TL",
+        "font_size",
+        "cmap",
+        "rtl_dir",
+        "text",
+        "output",
+        "output_tail",
+        "write",
+        "_render_matrix",
+        "_render_matrix_of",
+    )
+
+    def __init__(self, text_sink: Optional[Callable[[str], None]] = None) -> None:
+        self.cm_matrix = _IDENTITY_MATRIX
+        self.cm_stack: List[Tuple[Any, ...]] = []
+        self.tm_matrix = _IDENTITY_MATRIX
+        self.tm_prev = _IDENTITY_MATRIX  # will store cm_matrix * tm_matrix
+        self.char_scale = 1.0
+        self.space_scale = 1.0
+        self.space_width = 500.0  # will be set correctly at first Tf
+        self.TL = 0.0
+        self.font_size = 12.0  # init just in case of
+        # (encoding,CMAP,font resource name,dictionary-object of font)
+        self.cmap: Tuple[
+            Union[str, Dict[int, str]], Dict[str, str], str, Optional[DictionaryObject]
+        ] = ("charmap", {}, "NotInitialized", None)
+        self.rtl_dir = False  # right-to-left
+        self.text = ""
+        # the output is kept as a list of pieces, or handed to text_sink
+        self.output: List[str] = []
+        self.output_tail = ""  # last character of the output
+        self.write = self.output.append if text_sink is None else text_sink
+        self._render_matrix = _IDENTITY_MATRIX
+        self._render_matrix_of: Tuple[Optional[_Matrix], Optional[_Matrix]] = (
+            None,
+            None,
+        )
+
+    def render_matrix(self) -> _Matrix:
+        """Return tm_matrix * cm_matrix."""
+        tm_matrix, cm_matrix = self.tm_matrix, self.cm_matrix
+        matrix_of = self._render_matrix_of
+        if matrix_of[0] is not tm_matrix or matrix_of[1] is not cm_matrix:
+            self._render_matrix = _mult(tm_matrix, cm_matrix)
+            self._render_matrix_of = (tm_matrix, cm_matrix)
+        return self._render_matrix
+
+    def add_output(self, text: str) -> None:
+        if text:
+            self.write(text)
+            self.output_tail = text[-1]
+
 
 def set_custom_rtl(
     _min: Union[str, int, None] = None,
@@ -1310,6 +1432,7 @@ class PageObject(DictionaryObject):
         visitor_operand_before: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_operand_after: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_text: Optional[Callable[[Any, Any, Any, Any, Any], None]] = None,
+        text_sink: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         See extract_text for most arguments.
@@ -1319,9 +1442,6 @@ class PageObject(DictionaryObject):
                 None = the object; this allow to reuse the function on XObject
                 default = "/Content"
         """
-        text: str = ""
-        output: str = ""
-        rtl_dir: bool = False  # right-to-left
         cmaps: Dict[
             str,
             Tuple[
@@ -1338,16 +1458,10 @@ class PageObject(DictionaryObject):
         except Exception:
             return ""  # no resources means no text is possible (no font) we consider the file as not damaged, no need to check for TJ or Tj
         if "/Font" in resources_dict:
+            # only PdfReader keeps a per-document cache; fonts are then parsed once, not once per page
+            char_map_cache = getattr(pdf, "_char_map_cache", None)
             for f in cast(DictionaryObject, resources_dict["/Font"]):
-                cmaps[f] = build_char_map(f, space_width, obj)
-        cmap: Tuple[
-            Union[str, Dict[int, str]], Dict[str, str], str, Optional[DictionaryObject]
-        ] = (
-            "charmap",
-            {},
-            "NotInitialized",
-            None,
-        )  # (encoding,CMAP,font resource name,dictionary-object of font)
+                cmaps[f] = build_char_map(f, space_width, obj, char_map_cache)
         try:
             content = (
                 obj[content_key].get_object() if isinstance(content_key, str) else obj
@@ -1360,150 +1474,124 @@ class PageObject(DictionaryObject):
         # are strings where the byte->string encoding was unknown, so adding
         # them to the text here would be gibberish.
 
-        cm_matrix: List[float] = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
-        cm_stack = []
-        tm_matrix: List[float] = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
-        tm_prev: List[float] = [
-            1.0,
-            0.0,
-            0.0,
-            1.0,
-            0.0,
-            0.0,
-        ]  # will store cm_matrix * tm_matrix
-        char_scale = 1.0
-        space_scale = 1.0
-        _space_width: float = 500.0  # will be set correctly at first Tf
-        TL = 0.0
-        font_size = 12.0  # init just in case of
-
-        def mult(m: List[float], n: List[float]) -> List[float]:
-            return [
-                m[0] * n[0] + m[1] * n[2],
-                m[0] * n[1] + m[1] * n[3],
-                m[2] * n[0] + m[3] * n[2],
-                m[2] * n[1] + m[3] * n[3],
-                m[4] * n[0] + m[5] * n[2] + n[4],
-                m[4] * n[1] + m[5] * n[3] + n[5],
-            ]
+        state = _TextState(text_sink)
 
-        def orient(m: List[float]) -> int:
-            if m[3] > 1e-6:
-                return 0
-            elif m[3] < -1e-6:
-                return 180
-            elif m[1] > 0:
-                return 90
-            else:
-                return 270
+        def visit_text(text: str) -> None:
+            # the visitor gets the matrices as lists, as it always did
+            visitor_text(  # type: ignore
+                text,
+                list(state.cm_matrix),
+                list(state.tm_matrix),
+                state.cmap[3],
+                state.font_size,
+            )
 
         def current_spacewidth() -> float:
             # return space_scale * _space_width * char_scale
-            return _space_width / 1000.0
+            return state.space_width / 1000.0
 
         def process_operation(operator: bytes, operands: List) -> None:
-            nonlocal cm_matrix, cm_stack, tm_matrix, tm_prev, output, text, char_scale, space_scale, _space_width, TL, font_size, cmap, orientations, rtl_dir, visitor_text
             global CUSTOM_RTL_MIN, CUSTOM_RTL_MAX, CUSTOM_RTL_SPECIAL_CHARS
 
             check_crlf_space: bool = False
             # Table 5.4 page 405
             if operator == b"BT":
-                tm_matrix = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+                state.tm_matrix = _IDENTITY_MATRIX
                 # tm_prev = tm_matrix
-                output += text
+                state.add_output(state.text)
                 if visitor_text is not None:
-                    visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
+                    visit_text(state.text)
                 # based
                 # if output != "" and output[-1]!="\n":
                 #    output += "\n"
-                text = ""
+                state.text = ""
                 return None
             elif operator == b"ET":
-                output += text
+                state.add_output(state.text)
                 if visitor_text is not None:
-                    visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-                text = ""
+                    visit_text(state.text)
+                state.text = ""
             # table 4.7 "Graphics state operators", page 219
             # cm_matrix calculation is a reserved for the moment
             elif operator == b"q":
-                cm_stack.append(
+                state.cm_stack.append(
                     (
-                        cm_matrix,
-                        cmap,
-                        font_size,
-                        char_scale,
-                        space_scale,
-                        _space_width,
-                        TL,
+                        state.cm_matrix,
+                        state.cmap,
+                        state.font_size,
+                        state.char_scale,
+                        state.space_scale,
+                        state.space_width,
+                        state.TL,
                     )
                 )
             elif operator == b"Q":
                 try:
                     (
-                        cm_matrix,
-                        cmap,
-                        font_size,
-                        char_scale,
-                        space_scale,
-                        _space_width,
-                        TL,
-                    ) = cm_stack.pop()
+                        state.cm_matrix,
+                        state.cmap,
+                        state.font_size,
+                        state.char_scale,
+                        state.space_scale,
+                        state.space_width,
+                        state.TL,
+                    ) = state.cm_stack.pop()
                 except Exception:
-                    cm_matrix = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+                    state.cm_matrix = _IDENTITY_MATRIX
                 # rtl_dir = False
             elif operator == b"cm":
-                output += text
+                state.add_output(state.text)
                 if visitor_text is not None:
-                    visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-                text = ""
-                cm_matrix = mult(
-                    [
+                    visit_text(state.text)
+                state.text = ""
+                state.cm_matrix = _mult(
+                    (
                         float(operands[0]),
                         float(operands[1]),
                         float(operands[2]),
                         float(operands[3]),
                         float(operands[4]),
                         float(operands[5]),
-                    ],
-                    cm_matrix,
+                    ),
+                    state.cm_matrix,
                 )
                 # rtl_dir = False
             # Table 5.2 page 398
             elif operator == b"Tz":
-                char_scale = float(operands[0]) / 100.0
+                state.char_scale = float(operands[0]) / 100.0
             elif operator == b"Tw":
-                space_scale = 1.0 + float(operands[0])
+                state.space_scale = 1.0 + float(operands[0])
             elif operator == b"TL":
-                TL = float(operands[0])
+                state.TL = float(operands[0])
             elif operator == b"Tf":
-                if text != "":
-                    output += text  # .translate(cmap)
+                if state.text != "":
+                    state.add_output(state.text)  # .translate(cmap)
                     if visitor_text is not None:
-                        visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-                text = ""
+                        visit_text(state.text)
+                state.text = ""
                 # rtl_dir = False
                 try:
                     # charMapTuple: font_type, float(sp_width / 2), encoding, map_dict, font-dictionary
                     charMapTuple = cmaps[operands[0]]
-                    _space_width = charMapTuple[1]
+                    state.space_width = charMapTuple[1]
                     # current cmap: encoding, map_dict, font resource name (internal name, not the real font-name),
                     # font-dictionary. The font-dictionary describes the font.
-                    cmap = (
+                    state.cmap = (
                         charMapTuple[2],
                         charMapTuple[3],
                         operands[0],
                         charMapTuple[4],
                     )
                 except KeyError:  # font not found
-                    _space_width = unknown_char_map[1]
-                    cmap = (
+                    state.space_width = unknown_char_map[1]
+                    state.cmap = (
                         unknown_char_map[2],
                         unknown_char_map[3],
                         "???" + operands[0],
                         None,
                     )
                 try:
-                    font_size = float(operands[1])
+                    state.font_size = float(operands[1])
                 except Exception:
                     pass  # keep previous size
             # Table 5.5 page 406
@@ -1514,30 +1602,33 @@ class PageObject(DictionaryObject):
                 # i.e. tm[4] += tx, tm[5] += ty.
                 tx = float(operands[0])
                 ty = float(operands[1])
-                tm_matrix[4] += tx * tm_matrix[0] + ty * tm_matrix[2]
-                tm_matrix[5] += tx * tm_matrix[1] + ty * tm_matrix[3]
+                a, b, c, d, e, f = state.tm_matrix
+                state.tm_matrix = (
+                    a, b, c, d, e + (tx * a + ty * c), f + (tx * b + ty * d)
+                )
             elif operator == b"Tm":
                 check_crlf_space = True
-                tm_matrix = [
+                state.tm_matrix = (
                     float(operands[0]),
                     float(operands[1]),
                     float(operands[2]),
                     float(operands[3]),
                     float(operands[4]),
                     float(operands[5]),
-                ]
+                )
             elif operator == b"T*":
                 check_crlf_space = True
-                tm_matrix[5] -= TL
+                a, b, c, d, e, f = state.tm_matrix
+                state.tm_matrix = (a, b, c, d, e, f - state.TL)
 
             elif operator == b"Tj":
                 check_crlf_space = True
-                m = mult(tm_matrix, cm_matrix)
-                orientation = orient(m)
+                orientation = _orient(state.render_matrix())
                 if orientation in orientations:
                     if isinstance(operands[0], str):
-                        text += operands[0]
+                        state.text += operands[0]
                     else:
+                        cmap = state.cmap
                         t: str = ""
                         tt: bytes = (
                             encode_pdfdocencoding(operands[0])
@@ -1561,141 +1652,135 @@ class PageObject(DictionaryObject):
                                     for x in tt
                                 ]
                             )
-                        # "\u0590 - \u08FF \uFB50 - \uFDFF"
-                        for x in "".join(
-                            [cmap[1][x] if x in cmap[1] else x for x in t]
+                        text = state.text
+                        rtl_dir = state.rtl_dir
+                        t = "".join([cmap[1][x] if x in cmap[1] else x for x in t])
+                        if (
+                            not rtl_dir
+                            and CUSTOM_RTL_MAX < 0
+                            and (t == "" or max(t) < "\u0590")
                         ):
-                            xx = ord(x)
-                            # fmt: off
-                            if (  # cases where the current inserting order is kept (punctuation,...)
-                                (xx <= 0x2F)                        # punctuations but...
-                                or (0x3A <= xx and xx <= 0x40)      # numbers (x30-39)
-                                or (0x2000 <= xx and xx <= 0x206F)  # upper punctuations..
-                                or (0x20A0 <= xx and xx <= 0x21FF)  # but (numbers) indices/exponents
-                                or xx in CUSTOM_RTL_SPECIAL_CHARS   # customized....
-                            ):
-                                text = x + text if rtl_dir else text + x
-                            elif (  # right-to-left characters set
-                                (0x0590 <= xx and xx <= 0x08FF)
-                                or (0xFB1D <= xx and xx <= 0xFDFF)
-                                or (0xFE70 <= xx and xx <= 0xFEFF)
-                                or (CUSTOM_RTL_MIN <= xx and xx <= CUSTOM_RTL_MAX)
-                            ):
-                                # print("<",xx,x)
-                                if not rtl_dir:
-                                    rtl_dir = True
-                                    # print("RTL",text,"*")
-                                    output += text
-                                    if visitor_text is not None:
-                                        visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-                                    text = ""
-                                text = x + text
-                            else:  # left-to-right
-                                # print(">",xx,x,end="")
-                                if rtl_dir:
-                                    rtl_dir = False
-                                    # print("LTR",text,"*")
-                                    output += text
-                                    if visitor_text is not None:
-                                        visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-                                    text = ""
-                                text = text + x
-                            # fmt: on
+                            # no right-to-left character: nothing to reorder
+                            text += t
+                        else:
+                            # "\u0590 - \u08FF \uFB50 - \uFDFF"
+                            for x in t:
+                                xx = ord(x)
+                                # fmt: off
+                                if (  # cases where the current inserting order is kept (punctuation,...)
+                                    (xx <= 0x2F)                        # punctuations but...
+                                    or (0x3A <= xx and xx <= 0x40)      # numbers (x30-39)
+                                    or (0x2000 <= xx and xx <= 0x206F)  # upper punctuations..
+                                    or (0x20A0 <= xx and xx <= 0x21FF)  # but (numbers) indices/exponents
+                                    or xx in CUSTOM_RTL_SPECIAL_CHARS   # customized....
+                                ):
+                                    text = x + text if rtl_dir else text + x
+                                elif (  # right-to-left characters set
+                                    (0x0590 <= xx and xx <= 0x08FF)
+                                    or (0xFB1D <= xx and xx <= 0xFDFF)
+                                    or (0xFE70 <= xx and xx <= 0xFEFF)
+                                    or (CUSTOM_RTL_MIN <= xx and xx <= CUSTOM_RTL_MAX)
+                                ):
+                                    # print("<",xx,x)
+                                    if not rtl_dir:
+                                        rtl_dir = state.rtl_dir = True
+                                        # print("RTL",text,"*")
+                                        state.add_output(text)
+                                        if visitor_text is not None:
+                                            visit_text(text)
+                                        text = ""
+                                    text = x + text
+                                else:  # left-to-right
+                                    # print(">",xx,x,end="")
+                                    if rtl_dir:
+                                        rtl_dir = state.rtl_dir = False
+                                        # print("LTR",text,"*")
+                                        state.add_output(text)
+                                        if visitor_text is not None:
+                                            visit_text(text)
+                                        text = ""
+                                    text = text + x
+                                # fmt: on
+                        state.text = text
             else:
                 return None
             if check_crlf_space:
-                m = mult(tm_matrix, cm_matrix)
-                orientation = orient(m)
-                delta_x = m[4] - tm_prev[4]
-                delta_y = m[5] - tm_prev[5]
+                m = state.render_matrix()
+                orientation = _orient(m)
+                delta_x = m[4] - state.tm_prev[4]
+                delta_y = m[5] - state.tm_prev[5]
                 k = math.sqrt(abs(m[0] * m[3]) + abs(m[1] * m[2]))
-                f = font_size * k
-                tm_prev = m
+                f = state.font_size * k
+                state.tm_prev = m
                 if orientation not in orientations:
                     return None
+                text = state.text
                 try:
                     if orientation == 0:
                         if delta_y < -0.8 * f:
-                            if (output + text)[-1] != "\n":
-                                output += text + "\n"
+                            if (text or state.output_tail)[-1] != "\n":
+                                state.add_output(text + "\n")
                                 if visitor_text is not None:
-                                    visitor_text(
-                                        text + "\n",
-                                        cm_matrix,
-                                        tm_matrix,
-                                        cmap[3],
-                                        font_size,
-                                    )
-                                text = ""
+                                    visit_text(text + "\n")
+                                state.text = ""
                         elif (
                             abs(delta_y) < f * 0.3
                             and abs(delta_x) > current_spacewidth() * f * 15
                         ):
-                            if (output + text)[-1] != " ":
-                                text += " "
+                            if (text or state.output_tail)[-1] != " ":
+                                state.text += " "
                     elif orientation == 180:
                         if delta_y > 0.8 * f:
-                            if (output + text)[-1] != "\n":
-                                output += text + "\n"
+                            if (text or state.output_tail)[-1] != "\n":
+                                state.add_output(text + "\n")
                                 if visitor_text is not None:
-                                    visitor_text(
-                                        text + "\n",
-                                        cm_matrix,
-                                        tm_matrix,
-                                        cmap[3],
-                                        font_size,
-                                    )
-                                text = ""
+                                    visit_text(text + "\n")
+                                state.text = ""
                         elif (
                             abs(delta_y) < f * 0.3
                             and abs(delta_x) > current_spacewidth() * f * 15
                         ):
-                            if (output + text)[-1] != " ":
-                                text += " "
+                            if (text or state.output_tail)[-1] != " ":
+                                state.text += " "
                     elif orientation == 90:
                         if delta_x > 0.8 * f:
-                            if (output + text)[-1] != "\n":
-                                output += text + "\n"
+                            if (text or state.output_tail)[-1] != "\n":
+                                state.add_output(text + "\n")
                                 if visitor_text is not None:
-                                    visitor_text(
-                                        text + "\n",
-                                        cm_matrix,
-                                        tm_matrix,
-                                        cmap[3],
-                                        font_size,
-                                    )
-                                text = ""
+                                    visit_text(text + "\n")
+                                state.text = ""
                         elif (
                             abs(delta_x) < f * 0.3
                             and abs(delta_y) > current_spacewidth() * f * 15
                         ):
-                            if (output + text)[-1] != " ":
-                                text += " "
+                            if (text or state.output_tail)[-1] != " ":
+                                state.text += " "
                     elif orientation == 270:
                         if delta_x < -0.8 * f:
-                            if (output + text)[-1] != "\n":
-                                output += text + "\n"
+                            if (text or state.output_tail)[-1] != "\n":
+                                state.add_output(text + "\n")
                                 if visitor_text is not None:
-                                    visitor_text(
-                                        text + "\n",
-                                        cm_matrix,
-                                        tm_matrix,
-                                        cmap[3],
-                                        font_size,
-                                    )
-                                text = ""
+                                    visit_text(text + "\n")
+                                state.text = ""
                         elif (
                             abs(delta_x) < f * 0.3
                             and abs(delta_y) > current_spacewidth() * f * 15
                         ):
-                            if (output + text)[-1] != " ":
-                                text += " "
+                            if (text or state.output_tail)[-1] != " ":
+                                state.text += " "
                 except Exception:
                     pass
 
-        for operands, operator in content.operations:
+        if visitor_operand_before is None and visitor_operand_after is None:
+            operations = content.iter_operations(_TEXT_OPERATORS)
+        else:
+            # the visitors get to see every operation
+            operations = content.iter_operations()
+        for operands, operator in operations:
             if visitor_operand_before is not None:
-                visitor_operand_before(operator, operands, cm_matrix, tm_matrix)
+                visitor_operand_before(
+                    operator, operands, list(state.cm_matrix), list(state.tm_matrix)
+                )
             # multiple operators are defined in here ####
             if operator == b"'":
                 process_operation(b"T*", [])
@@ -1712,29 +1797,29 @@ class PageObject(DictionaryObject):
                 for op in operands[0]:
                     if isinstance(op, (str, bytes)):
                         process_operation(b"Tj", [op])
-                    if isinstance(op, (int, float, NumberObject, FloatObject)):
+                    elif isinstance(op, (int, float, NumberObject, FloatObject)):
                         if (
-                            (abs(float(op)) >= _space_width)
-                            and (len(text) > 0)
-                            and (text[-1] != " ")
+                            (abs(float(op)) >= state.space_width)
+                            and (len(state.text) > 0)
+                            and (state.text[-1] != " ")
                         ):
                             process_operation(b"Tj", [" "])
             elif operator == b"Do":
-                output += text
+                state.add_output(state.text)
                 if visitor_text is not None:
-                    visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
+                    visit_text(state.text)
                 try:
-                    if output[-1] != "\n":
-                        output += "\n"
+                    if state.output_tail[-1] != "\n":
+                        state.add_output("\n")
                         if visitor_text is not None:
-                            visitor_text("\n", cm_matrix, tm_matrix, cmap[3], font_size)
+                            visit_text("\n")
                 except IndexError:
                     pass
                 try:
                     xobj = resources_dict["/XObject"]
                     if xobj[operands[0]]["/Subtype"] != "/Image":  # type: ignore
                         # output += text
-                        text = self.extract_xform_text(
+                        state.text = self.extract_xform_text(
                             xobj[operands[0]],  # type: ignore
                             orientations,
                             space_width,
@@ -1742,24 +1827,26 @@ class PageObject(DictionaryObject):
                             visitor_operand_after,
                             visitor_text,
                         )
-                        output += text
+                        state.add_output(state.text)
                         if visitor_text is not None:
-                            visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
+                            visit_text(state.text)
                 except Exception:
                     logger_warning(
                         f" impossible to decode XFormObject {operands[0]}",
                         __name__,
                     )
                 finally:
-                    text = ""
+                    state.text = ""
             else:
                 process_operation(operator, operands)
             if visitor_operand_after is not None:
-                visitor_operand_after(operator, operands, cm_matrix, tm_matrix)
-        output += text  # just in case of
-        if text != "" and visitor_text is not None:
-            visitor_text(text, cm_matrix, tm_matrix, cmap[3], font_size)
-        return output
+                visitor_operand_after(
+                    operator, operands, list(state.cm_matrix), list(state.tm_matrix)
+                )
+        state.add_output(state.text)  # just in case of
+        if state.text != "" and visitor_text is not None:
+            visit_text(state.text)
+        return "".join(state.output)
 
     def extract_text(
         self,
@@ -1771,6 +1858,7 @@ class PageObject(DictionaryObject):
         visitor_operand_before: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_operand_after: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_text: Optional[Callable[[Any, Any, Any, Any, Any], None]] = None,
+        text_sink: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         Locate all text drawing commands, in the order they are provided in the
@@ -1808,6 +1896,9 @@ class PageObject(DictionaryObject):
                 text matrix, font-dictionary and font-size.
                 The font-dictionary may be None in case of unknown fonts.
                 If not None it may e.g. contain key "/BaseFont" with value "/Arial,Bold".
+            text_sink: function to be called with each piece of the extracted text,
+                in order. When given, the text is not collected and an empty
+                string is returned.
 
         Returns:
             The extracted text
@@ -1857,6 +1948,7 @@ class PageObject(DictionaryObject):
             visitor_operand_before,
             visitor_operand_after,
             visitor_text,
+            text_sink,
         )
 
     def extract_xform_text(
@@ -1867,6 +1959,7 @@ class PageObject(DictionaryObject):
         visitor_operand_before: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_operand_after: Optional[Callable[[Any, Any, Any, Any], None]] = None,
         visitor_text: Optional[Callable[[Any, Any, Any, Any, Any], None]] = None,
+        text_sink: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         Extract text from an XObject.
@@ -1886,6 +1979,7 @@ class PageObject(DictionaryObject):
             visitor_operand_before,
             visitor_operand_after,
             visitor_text,
+            text_sink,
         )
 
     def extractText(
@@ -1,7 +1,7 @@
 """Helpers for working with PDF types."""
 
 from pathlib import Path
-from typing import IO, Any, Dict, List, Optional, Tuple, Union
+from typing import IO, Any, Dict, List, Mapping, Optional, Tuple, Union
 
 try:
     # Python 3.8+: https://peps.python.org/pep-0586
@@ -40,7 +40,7 @@ class PdfReaderProtocol(Protocol):  # pragma: no cover
         ...
 
     @property
-    def xref(self) -> Dict[int, Dict[int, Any]]:
+    def xref(self) -> Mapping[int, Mapping[int, Any]]:
         ...
 
     @property
@@ -30,16 +30,20 @@
 import os
 import re
 import struct
+import sys
 import zlib
+from array import array
 from datetime import datetime
 from io import BytesIO
+from itertools import groupby
 from pathlib import Path
 from typing import (
     Any,
-    Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
+    MutableMapping,
     Optional,
     Tuple,
     Union,
@@ -56,11 +60,13 @@ from ._utils import (
     deprecation_no_replacement,
     deprecation_with_replacement,
     logger_warning,
+    open_mapped_file,
     read_non_whitespace,
     read_previous_line,
     read_until_whitespace,
     skip_over_comment,
     skip_over_whitespace,
+    stream_buffer,
 )
 from .constants import CatalogAttributes as CA
 from .constants import CatalogDictionary as CD
@@ -116,6 +122,274 @@ def convertToInt(
     return convert_to_int(d, size)
 
 
+# array typecodes of unsigned integers by item size
+_UNSIGNED_TYPECODES = {array(typecode).itemsize: typecode for typecode in "BHILQ"}
+
+
+def _is_plain_xref_subsection(block: bytes, size: int) -> bool:
+    """Whether ``block`` holds ``size`` well-formed 20-byte xref entries."""
+    return (
+        len(block) == 20 * size
+        and block[10::20] == block[16::20] == b" " * size
+        and not block[17::20].translate(None, b"fn")
+        and not block[18::20].translate(None, b" \r")
+        and not block[19::20].translate(None, b"\r\n")
+        and len(block.translate(None, b"0123456789")) == 5 * size
+    )
+
+
+class _XrefTable(MutableMapping[int, int]):
+    """
+    Mapping of object numbers to integers, stored in an array indexed by
+    the object number.
+
+    Object numbers within a PDF are mostly dense, so this takes a few bytes
+    per object where a dict of ints takes around a hundred. Numbers far
+    beyond the current range are kept in a dict rather than growing the
+    array to reach them.
+    """
+
+    typecode = "q"
+
+    def __init__(self) -> None:
+        self._values = array(self.typecode)
+        self._missing = -(1 << (8 * self._values.itemsize - 1))
+        self._sparse: Dict[int, int] = {}
+        self._len = 0
+
+    def _covers(self, start: int, stop: int) -> bool:
+        """
+        Grow the array to hold ``start:stop`` if that is not too far off.
+
+        ``start:stop`` is the span of the values about to be stored, so the
+        array only grows in proportion to entries that were actually read.
+        """
+        values = self._values
+        if start < 0 or start > 2 * len(values) + 1024:
+            return False
+        if stop > len(values):
+            # the array is kept at most about twice as long as the number of
+            # entries it holds, however far a subsection claims to reach
+            if stop > 2 * (self._len + stop - start) + 1024:
+                return False
+            values.extend(
+                array(self.typecode, [self._missing])
+                * (max(stop, 2 * len(values)) - len(values))
+            )
+            # entries kept aside that the array now covers move into it
+            for num in [k for k in self._sparse if 0 <= k < len(values)]:
+                values[num] = self._sparse.pop(num)
+        return True
+
+    def add_missing(self, start: int, values: List[int]) -> Union[bool, List[bool]]:
+        """
+        Store ``values`` from object number ``start`` on, skipping the numbers
+        that already have an entry.
+
+        :return: ``True`` if every value was stored, otherwise a list telling
+            for each value whether it was.
+        """
+        stop = start + len(values)
+        if self._covers(start, stop):
+            current = self._values[start:stop]
+            if current.count(self._missing) == len(current):
+                self._values[start:stop] = array(self.typecode, values)
+                self._len += len(values)
+                return True
+        added = []
+        for num, value in enumerate(values, start):
+            added.append(num not in self)
+            if added[-1]:
+                self[num] = value
+        return added
+
+    def assign(
+        self, start: int, values: List[int], mask: Union[bool, List[bool]] = True
+    ) -> None:
+        """Store ``values`` from object number ``start`` on, where ``mask`` is set."""
+        if mask is False:
+            return
+        stop = start + len(values)
+        if self._covers(start, stop):
+            current = self._values[start:stop]
+            if mask is not True:
+                values = [
+                    value if selected else old
+                    for value, selected, old in zip(values, mask, current)
+                ]
+            new = array(self.typecode, values)
+            self._len += current.count(self._missing) - new.count(self._missing)
+            self._values[start:stop] = new
+            return
+        selection = [mask] * len(values) if isinstance(mask, bool) else mask
+        for num, value, selected in zip(range(start, stop), values, selection):
+            if selected:
+                self[num] = value
+
+    def present(self, start: int, stop: int) -> List[bool]:
+        """Tell for each object number in ``start:stop`` whether it has an entry."""
+        if start < 0:
+            return [num in self for num in range(start, stop)]
+        missing = self._missing
+        present = [value != missing for value in self._values[start:stop]]
+        # beyond the array, only the entries kept aside
+        beyond = range(max(start, len(self._values)), stop)
+        if self._sparse:
+            present.extend(num in self._sparse for num in beyond)
+        else:
+            present.extend([False] * len(beyond))
+        return present
+
+    def __getitem__(self, num: int) -> int:
+        if 0 <= num < len(self._values):
+            value = self._values[num]
+            if value == self._missing:
+                raise KeyError(num)
+            return value
+        return self._sparse[num]
+
+    def __setitem__(self, num: int, value: int) -> None:
+        if self._covers(num, num + 1):
+            if self._values[num] == self._missing:
+                self._len += 1
+            self._values[num] = value
+        else:
+            if num not in self._sparse:
+                self._len += 1
+            self._sparse[num] = value
+
+    def __delitem__(self, num: int) -> None:
+        if 0 <= num < len(self._values) and self._values[num] != self._missing:
+            self._values[num] = self._missing
+        else:
+            del self._sparse[num]
+        self._len -= 1
+
+    def __contains__(self, num: object) -> bool:
+        if isinstance(num, int) and 0 <= num < len(self._values):
+            return self._values[num] != self._missing
+        return num in self._sparse
+
+    def __iter__(self) -> Iterator[int]:
+        missing = self._missing
+        for num, value in enumerate(self._values):
+            if value != missing:
+                yield num
+        yield from self._sparse
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+class _XrefFlags(_XrefTable):
+    """Same as :class:`_XrefTable`, for boolean values."""
+
+    typecode = "b"
+
+    def __getitem__(self, num: int) -> bool:  # type: ignore[override]
+        return bool(super().__getitem__(num))
+
+
+class _XrefObjectStreams(MutableMapping[int, Tuple[int, int]]):
+    """
+    Mapping of the numbers of compressed objects to the number of their
+    object stream and their index within it, kept in two :class:`_XrefTable`.
+    """
+
+    def __init__(self) -> None:
+        self._streams = _XrefTable()
+        self._indices = _XrefTable()
+
+    def assign(
+        self,
+        start: int,
+        streams: List[int],
+        indices: List[int],
+        mask: Union[bool, List[bool]] = True,
+    ) -> None:
+        """Store the entries from object number ``start`` on, where ``mask`` is set."""
+        self._streams.assign(start, streams, mask)
+        self._indices.assign(start, indices, mask)
+
+    def present(self, start: int, stop: int) -> List[bool]:
+        """Tell for each object number in ``start:stop`` whether it has an entry."""
+        return self._streams.present(start, stop)
+
+    def __getitem__(self, num: int) -> Tuple[int, int]:
+        return self._streams[num], self._indices[num]
+
+    def __setitem__(self, num: int, value: Tuple[int, int]) -> None:
+        self._streams[num], self._indices[num] = value
+
+    def __delitem__(self, num: int) -> None:
+        del self._streams[num]
+        del self._indices[num]
+
+    def __contains__(self, num: object) -> bool:
+        return num in self._streams
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._streams)
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+def _read_xref_stream_fields(
+    data: bytes, entry_sizes: List[int], count: int
+) -> List[List[int]]:
+    """
+    Decode the type and the two following fields of ``count`` entries of a
+    cross-reference stream.
+
+    :param data: the decoded data of the stream
+    :param entry_sizes: the ``/W`` array, the width of each field in bytes
+    :param count: the number of entries listed by ``/Index``
+    :return: one list of values per field, for the entries that start within
+        the data. The entries past them read as zeros; they are never
+        recorded, so they are not decoded either.
+    """
+    widths = [int(size) for size in entry_sizes[:3]]
+    if max(widths) > 8:
+        raise PdfReadError(f"Invalid entry sizes: {entry_sizes}")
+    stride = sum(widths)
+    # a bogus /Size or /Index must not turn into one list item per entry
+    count = min(count, -(-len(data) // stride)) if stride else 0
+    # entries cut short by the end of the data are decoded one by one below
+    full = min(count, len(data) // stride) if stride else count
+    fields = []
+    offset = 0
+    for i, width in enumerate(widths):
+        if width == 0:
+            # PDF Spec Table 17: A value of zero for an element in the
+            # W array indicates...the default value shall be used
+            fields.append([1 if i == 0 else 0] * count)
+            continue
+        # Gather the big-endian field of every entry into items of a
+        # machine integer type, and let array convert them all at once.
+        itemsize = next(size for size in (1, 2, 4, 8) if size >= width)
+        items = bytearray(full * itemsize)
+        for byte in range(width):
+            items[itemsize - width + byte :: itemsize] = data[
+                offset + byte : full * stride : stride
+            ]
+        values = array("q" if width == 8 else _UNSIGNED_TYPECODES[itemsize], items)
+        if sys.byteorder == "little":
+            values.byteswap()
+        field = values.tolist()
+        for pos in range(full * stride + offset, count * stride, stride):
+            field.append(cast(int, convert_to_int(data[pos : pos + width], width)))
+        fields.append(field)
+        offset += width
+    return fields
+
+
 class DocumentInformation(DictionaryObject):
     """
     A class representing the basic document metadata provided in a PDF File.
@@ -285,7 +559,8 @@ class PdfReader:
 
     :param stream: A File object or an object that supports the standard read
         and seek methods similar to a File object. Could also be a
-        string representing a path to a PDF file.
+        string representing a path to a PDF file, or a file descriptor.
+        Paths and file descriptors are read through a memory map.
     :param bool strict: Determines whether user should be warned of all
         problems and also causes some correctable problems to be fatal.
         Defaults to ``False``.
@@ -294,9 +569,12 @@ class PdfReader:
         Defaults to ``None``
     """
 
+    # number of decoded object streams kept by _read_object_stream
+    _object_stream_cache_size = 8
+
     def __init__(
         self,
-        stream: Union[StrByteType, Path],
+        stream: Union[StrByteType, Path, int],
         strict: bool = False,
         password: Union[None, str, bytes] = None,
     ) -> None:
@@ -307,15 +585,20 @@ class PdfReader:
         self._page_id2num: Optional[
             Dict[Any, Any]
         ] = None  # map page indirect_reference number to Page Number
+        # char maps built for text extraction, keyed by (font idnum, generation, space width)
+        self._char_map_cache: Dict[Tuple[int, int, float], Tuple] = {}
+        # decoded object streams by stream number, least recently used first
+        self._object_streams: Dict[
+            int, Tuple[bytes, int, int, Dict[int, Tuple[int, int]]]
+        ] = {}
         if hasattr(stream, "mode") and "b" not in stream.mode:  # type: ignore
             logger_warning(
                 "PdfReader stream/file object is not in binary mode. "
                 "It may not be read correctly.",
                 __name__,
             )
-        if isinstance(stream, (str, Path)):
-            with open(stream, "rb") as fh:
-                stream = BytesIO(fh.read())
+        if isinstance(stream, (str, Path, int)):
+            stream = open_mapped_file(stream)
         self.read(stream)
         self.stream = stream
 
@@ -985,6 +1268,29 @@ class PdfReader:
         """Read-only property that emulates a list of :py:class:`Page<PyPDF2._page.Page>` objects."""
         return _VirtualList(self._get_num_pages, self._get_page)  # type: ignore
 
+    def iter_page_texts(
+        self, start: int = 0, stop: Optional[int] = None, **kwargs: Any
+    ) -> Iterator[str]:
+        """
+        Lazily extract the text of each page, in page order.
+
+        Text is only extracted for a page when the caller asks for the
+        next item, so a consumer that has enough text can simply stop
+        iterating and the remaining pages are never parsed.
+
+        :param int start: Index of the first page to extract.
+        :param int stop: Index one past the last page to extract.
+            Defaults to the end of the document.
+        :param kwargs: Passed through to
+            :meth:`PageObject.extract_text()<PyPDF2._page.PageObject.extract_text>`.
+        :return: A generator of page texts.
+        """
+        pages = self.pages
+        if stop is None:
+            stop = len(pages)
+        for page_number in range(start, stop):
+            yield pages[page_number].extract_text(**kwargs)
+
     @property
     def page_layout(self) -> Optional[str]:
         """
@@ -1127,59 +1433,94 @@ class PdfReader:
             # TODO: Could flattened_pages be None at this point?
             self.flattened_pages.append(page_obj)  # type: ignore
 
+    def _read_object_stream(
+        self, stmnum: int
+    ) -> Tuple[bytes, int, int, Dict[int, Tuple[int, int]]]:
+        """
+        Decode an object stream and index the objects it holds.
+
+        The most recently used streams are kept, so resolving every object of
+        a stream decodes and parses its header once.
+
+        :param stmnum: object number of the ``/ObjStm`` stream.
+        :return: the decoded data, the offset of its first object, the number
+            of objects and a ``{objnum: (index, offset)}`` map.
+        """
+        cached = self._object_streams.pop(stmnum, None)
+        if cached is None:
+            obj_stm: EncodedStreamObject = IndirectObject(stmnum, 0, self).get_object()  # type: ignore
+            # This is an xref to a stream, so its type better be a stream
+            assert cast(str, obj_stm["/Type"]) == "/ObjStm"
+            keep_decoded = not (
+                isinstance(obj_stm, EncodedStreamObject)
+                and obj_stm.decoded_self is None
+            )
+            data = b_(cast(bytes, obj_stm.get_data()))
+            if not keep_decoded:
+                # the decoded data is only held here, not by the stream object
+                obj_stm.decoded_self = None
+            stream_data = BytesIO(data)
+            index: Dict[int, Tuple[int, int]] = {}
+            # /N is the number of indirect objects in the stream
+            for i in range(obj_stm["/N"]):  # type: ignore
+                read_non_whitespace(stream_data)
+                stream_data.seek(-1, 1)
+                objnum = int(NumberObject.read_from_stream(stream_data))
+                read_non_whitespace(stream_data)
+                stream_data.seek(-1, 1)
+                offset = int(NumberObject.read_from_stream(stream_data))
+                read_non_whitespace(stream_data)
+                stream_data.seek(-1, 1)
+                index.setdefault(objnum, (i, offset))
+            cached = (
+                data,
+                cast(int, obj_stm["/First"]),
+                cast(int, obj_stm["/N"]),
+                index,
+            )
+            if len(self._object_streams) >= self._object_stream_cache_size:
+                del self._object_streams[next(iter(self._object_streams))]
+        self._object_streams[stmnum] = cached
+        return cached
+
     def _get_object_from_stream(
         self, indirect_reference: IndirectObject
     ) -> Union[int, PdfObject, str]:
         # indirect reference to object in object stream
-        # read the entire object stream into memory
         stmnum, idx = self.xref_objStm[indirect_reference.idnum]
-        obj_stm: EncodedStreamObject = IndirectObject(stmnum, 0, self).get_object()  # type: ignore
-        # This is an xref to a stream, so its type better be a stream
-        assert cast(str, obj_stm["/Type"]) == "/ObjStm"
-        # /N is the number of indirect objects in the stream
-        assert idx < obj_stm["/N"]
-        stream_data = BytesIO(b_(obj_stm.get_data()))  # type: ignore
-        for i in range(obj_stm["/N"]):  # type: ignore
-            read_non_whitespace(stream_data)
-            stream_data.seek(-1, 1)
-            objnum = NumberObject.read_from_stream(stream_data)
-            read_non_whitespace(stream_data)
-            stream_data.seek(-1, 1)
-            offset = NumberObject.read_from_stream(stream_data)
-            read_non_whitespace(stream_data)
-            stream_data.seek(-1, 1)
-            if objnum != indirect_reference.idnum:
-                # We're only interested in one object
-                continue
-            if self.strict and idx != i:
-                raise PdfReadError("Object is in wrong index.")
-            stream_data.seek(int(obj_stm["/First"] + offset), 0)  # type: ignore
-
-            # to cope with some case where the 'pointer' is on a white space
-            read_non_whitespace(stream_data)
-            stream_data.seek(-1, 1)
-
-            try:
-                obj = read_object(stream_data, self)
-            except PdfStreamError as exc:
-                # Stream object cannot be read. Normally, a critical error, but
-                # Adobe Reader doesn't complain, so continue (in strict mode?)
-                logger_warning(
-                    f"Invalid stream (index {i}) within object "
-                    f"{indirect_reference.idnum} {indirect_reference.generation}: "
-                    f"{exc}",
-                    __name__,
-                )
+        data, first, count, index = self._read_object_stream(stmnum)
+        assert idx < count
+        if indirect_reference.idnum not in index:
+            if self.strict:
+                raise PdfReadError("This is a fatal error in strict mode.")
+            return NullObject()
+        i, offset = index[indirect_reference.idnum]
+        if self.strict and idx != i:
+            raise PdfReadError("Object is in wrong index.")
+        stream_data = BytesIO(data)
+        stream_data.seek(int(first + offset), 0)
+
+        # to cope with some case where the 'pointer' is on a white space
+        read_non_whitespace(stream_data)
+        stream_data.seek(-1, 1)
 
-                if self.strict:
-                    raise PdfReadError(f"Can't read object stream: {exc}")
-                # Replace with null. Hopefully it's nothing important.
-                obj = NullObject()
-            return obj
+        try:
+            obj = read_object(stream_data, self)
+        except PdfStreamError as exc:
+            # Stream object cannot be read. Normally, a critical error, but
+            # Adobe Reader doesn't complain, so continue (in strict mode?)
+            logger_warning(
+                f"Invalid stream (index {i}) within object "
+                f"{indirect_reference.idnum} {indirect_reference.generation}: "
+                f"{exc}",
+                __name__,
+            )
 
-        if self.strict:
-            raise PdfReadError("This is a fatal error in strict mode.")
-        return NullObject()
+            if self.strict:
+                raise PdfReadError(f"Can't read object stream: {exc}")
+            # Replace with null. Hopefully it's nothing important.
+            obj = NullObject()
+        return obj
 
     def _get_indirect_object(self, num: int, gen: int) -> Optional[PdfObject]:
         """
@@ -1207,7 +1548,8 @@ class PdfReader:
             indirect_reference.generation in self.xref
             and indirect_reference.idnum in self.xref[indirect_reference.generation]
         ):
-            if self.xref_free_entry.get(indirect_reference.generation, {}).get(
+            free_entries = self.xref_free_entry.get(indirect_reference.generation)
+            if free_entries is not None and free_entries.get(
                 indirect_reference.idnum, False
             ):
                 return NullObject()
@@ -1216,13 +1558,7 @@ class PdfReader:
             try:
                 idnum, generation = self.read_object_header(self.stream)
             except Exception:
-                if hasattr(self.stream, "getbuffer"):
-                    buf = bytes(self.stream.getbuffer())  # type: ignore
-                else:
-                    p = self.stream.tell()
-                    self.stream.seek(0, 0)
-                    buf = self.stream.read(-1)
-                    self.stream.seek(p, 0)
+                buf = stream_buffer(self.stream)
                 m = re.search(
                     rf"\s{indirect_reference.idnum}\s+{indirect_reference.generation}\s+obj".encode(),
                     buf,
@@ -1270,13 +1606,7 @@ class PdfReader:
                     retval, indirect_reference.idnum, indirect_reference.generation
                 )
         else:
-            if hasattr(self.stream, "getbuffer"):
-                buf = bytes(self.stream.getbuffer())  # type: ignore
-            else:
-                p = self.stream.tell()
-                self.stream.seek(0, 0)
-                buf = self.stream.read(-1)
-                self.stream.seek(p, 0)
+            buf = stream_buffer(self.stream)
             m = re.search(
                 rf"\s{indirect_reference.idnum}\s+{indirect_reference.generation}\s+obj".encode(),
                 buf,
@@ -1287,7 +1617,7 @@ class PdfReader:
                     __name__,
                 )
                 if indirect_reference.generation not in self.xref:
-                    self.xref[indirect_reference.generation] = {}
+                    self.xref[indirect_reference.generation] = _XrefTable()
                 self.xref[indirect_reference.generation][indirect_reference.idnum] = (
                     m.start(0) + 1
                 )
@@ -1496,6 +1826,7 @@ class PdfReader:
         read_non_whitespace(stream)
         stream.seek(-1, 1)
         firsttime = True  # check if the first time looking at the xref table
+        free: Optional[bool] = None  # last free flag read
         while True:
             num = cast(int, read_object(stream, self))
             if firsttime and num != 0:
@@ -1513,6 +1844,25 @@ class PdfReader:
             size = cast(int, read_object(stream, self))
             read_non_whitespace(stream)
             stream.seek(-1, 1)
+            block = stream.read(20 * size)
+            if _is_plain_xref_subsection(block, size):
+                # well-formed subsection: parse it in bulk
+                self._add_xref_entries(
+                    num,
+                    [int(block[i : i + 10]) for i in range(0, len(block), 20)],
+                    [int(block[i : i + 5]) for i in range(11, len(block), 20)],
+                    [flag == ord("f") for flag in block[17::20]],
+                )
+                if size:
+                    free = block[-3:-2] == b"f"
+                num += size
+                size = 0
+            else:
+                stream.seek(-len(block), 1)
+            first_num = num
+            offsets: List[int] = []
+            generations: List[int] = []
+            free_entries: List[Optional[bool]] = []
             cnt = 0
             while cnt < size:
                 line = stream.read(20)
@@ -1538,19 +1888,13 @@ class PdfReader:
 
                 try:
                     offset_b, generation_b = line[:16].split(b" ")
-                    entry_type_b = line[17:18]
+                    # an entry that cannot be split keeps the previous flag
+                    free = line[17:18] == b"f"
 
                     offset, generation = int(offset_b), int(generation_b)
                 except Exception:
                     # if something wrong occured
-                    if hasattr(stream, "getbuffer"):
-                        buf = bytes(stream.getbuffer())  # type: ignore
-                    else:
-                        p = stream.tell()
-                        stream.seek(0, 0)
-                        buf = stream.read(-1)
-                        stream.seek(p)
-
+                    buf = stream_buffer(stream)
                     f = re.search(f"{num}\\s+(\\d+)\\s+obj".encode(), buf)
                     if f is None:
                         logger_warning(
@@ -1567,27 +1911,12 @@ class PdfReader:
                         generation = int(f.group(1))
                         offset = f.start()
 
-                if generation not in self.xref:
-                    self.xref[generation] = {}
-                    self.xref_free_entry[generation] = {}
-                if num in self.xref[generation]:
-                    # It really seems like we should allow the last
-                    # xref table in the file to override previous
-                    # ones. Since we read the file backwards, assume
-                    # any existing key is already set correctly.
-                    pass
-                else:
-                    self.xref[generation][num] = offset
-                    try:
-                        self.xref_free_entry[generation][num] = entry_type_b == b"f"
-                    except Exception:
-                        pass
-                    try:
-                        self.xref_free_entry[65535][num] = entry_type_b == b"f"
-                    except Exception:
-                        pass
+                offsets.append(offset)
+                generations.append(generation)
+                free_entries.append(free)
                 cnt += 1
                 num += 1
+            self._add_xref_entries(first_num, offsets, generations, free_entries)
             read_non_whitespace(stream)
             stream.seek(-1, 1)
             trailertag = stream.read(7)
@@ -1597,12 +1926,45 @@ class PdfReader:
             else:
                 break
 
+    def _add_xref_entries(
+        self,
+        start: int,
+        offsets: List[int],
+        generations: List[int],
+        free: List[Optional[bool]],
+    ) -> None:
+        # Entries are added in order, a run of equal generations at a time
+        stop = 0
+        for generation, run in groupby(generations):
+            start_idx, stop = stop, stop + len(list(run))
+            if generation not in self.xref:
+                self.xref[generation] = _XrefTable()
+                self.xref_free_entry[generation] = _XrefFlags()
+            # It really seems like we should allow the last
+            # xref table in the file to override previous
+            # ones. Since we read the file backwards, assume
+            # any existing key is already set correctly.
+            added = self.xref[generation].add_missing(
+                start + start_idx, offsets[start_idx:stop]
+            )
+            flags = free[start_idx:stop]
+            if None in flags:
+                # entries that could not be parsed have no free flag
+                if isinstance(added, bool):
+                    added = [added] * len(flags)
+                added = [a and f is not None for a, f in zip(added, flags)]
+            for flags_generation in (generation, 65535):
+                if flags_generation in self.xref_free_entry:
+                    self.xref_free_entry[flags_generation].assign(
+                        start + start_idx, flags, added  # type: ignore
+                    )
+
     def _read_xref_tables_and_trailers(
         self, stream: StreamType, startxref: Optional[int], xref_issue_nr: int
     ) -> None:
-        self.xref: Dict[int, Dict[Any, Any]] = {}
-        self.xref_free_entry: Dict[int, Dict[Any, Any]] = {}
-        self.xref_objStm: Dict[int, Tuple[Any, Any]] = {}
+        self.xref: Dict[int, _XrefTable] = {}
+        self.xref_free_entry: Dict[int, _XrefFlags] = {}
+        self.xref_objStm = _XrefObjectStreams()
         self.trailer = DictionaryObject()
         while startxref is not None:
             # load the xref table
@@ -1721,35 +2083,16 @@ class PdfReader:
         xrefstream = cast(ContentStream, read_object(stream, self))
         assert cast(str, xrefstream["/Type"]) == "/XRef"
         self.cache_indirect_object(generation, idnum, xrefstream)
-        stream_data = BytesIO(b_(xrefstream.get_data()))
         # Index pairs specify the subsections in the dictionary. If
         # none create one subsection that spans everything.
         idx_pairs = xrefstream.get("/Index", [0, xrefstream.get("/Size")])
-        entry_sizes = cast(Dict[Any, Any], xrefstream.get("/W"))
+        entry_sizes = cast(List[int], xrefstream.get("/W"))
         assert len(entry_sizes) >= 3
         if self.strict and len(entry_sizes) > 3:
             raise PdfReadError(f"Too many entry sizes: {entry_sizes}")
 
-        def get_entry(i: int) -> Union[int, Tuple[int, ...]]:
-            # Reads the correct number of bytes for each entry. See the
-            # discussion of the W parameter in PDF spec table 17.
-            if entry_sizes[i] > 0:
-                d = stream_data.read(entry_sizes[i])
-                return convert_to_int(d, entry_sizes[i])
-
-            # PDF Spec Table 17: A value of zero for an element in the
-            # W array indicates...the default value shall be used
-            if i == 0:
-                return 1  # First value defaults to 1
-            else:
-                return 0
-
-        def used_before(num: int, generation: Union[int, Tuple[int, ...]]) -> bool:
-            # We move backwards through the xrefs, don't replace any.
-            return num in self.xref.get(generation, []) or num in self.xref_objStm  # type: ignore
-
         # Iterate through each subsection
-        self._read_xref_subsections(idx_pairs, get_entry, used_before)
+        self._read_xref_subsections(idx_pairs, b_(xrefstream.get_data()), entry_sizes)
         return xrefstream
 
     @staticmethod
@@ -1779,14 +2122,13 @@ class PdfReader:
 
     def _rebuild_xref_table(self, stream: StreamType) -> None:
         self.xref = {}
-        stream.seek(0, 0)
-        f_ = stream.read(-1)
+        f_ = stream_buffer(stream)
 
         for m in re.finditer(rb"[\r\n \t][ \t]*(\d+)[ \t]+(\d+)[ \t]+obj", f_):
             idnum = int(m.group(1))
             generation = int(m.group(2))
             if generation not in self.xref:
-                self.xref[generation] = {}
+                self.xref[generation] = _XrefTable()
             self.xref[generation][idnum] = m.start(1)
         stream.seek(0, 0)
         for m in re.finditer(rb"[\r\n \t][ \t]*trailer[\r\n \t]*(<<)", f_):
@@ -1797,41 +2139,73 @@ class PdfReader:
                 self.trailer[key] = value
 
     def _read_xref_subsections(
-        self,
-        idx_pairs: List[int],
-        get_entry: Callable[[int], Union[int, Tuple[int, ...]]],
-        used_before: Callable[[int, Union[int, Tuple[int, ...]]], bool],
+        self, idx_pairs: List[int], data: bytes, entry_sizes: List[int]
     ) -> None:
+        pairs = list(self._pairs(idx_pairs))
+        types, fields_1, fields_2 = _read_xref_stream_fields(
+            data, entry_sizes, sum(size for _, size in pairs)
+        )
+        pos = 0
         last_end = 0
-        for start, size in self._pairs(idx_pairs):
+        for start, size in pairs:
             # The subsections must increase
             assert start >= last_end
             last_end = start + size
-            for num in range(start, start + size):
-                # The first entry is the type
-                xref_type = get_entry(0)
-                # The rest of the elements depend on the xref_type
-                if xref_type == 0:
-                    # linked list of free objects
-                    next_free_object = get_entry(1)  # noqa: F841
-                    next_generation = get_entry(2)  # noqa: F841
-                elif xref_type == 1:
-                    # objects that are in use but are not compressed
-                    byte_offset = get_entry(1)
-                    generation = get_entry(2)
-                    if generation not in self.xref:
-                        self.xref[generation] = {}  # type: ignore
-                    if not used_before(num, generation):
-                        self.xref[generation][num] = byte_offset  # type: ignore
-                elif xref_type == 2:
-                    # compressed objects
-                    objstr_num = get_entry(1)
-                    obstr_idx = get_entry(2)
-                    generation = 0  # PDF spec table 18, generation is 0
-                    if not used_before(num, generation):
-                        self.xref_objStm[num] = (objstr_num, obstr_idx)
-                elif self.strict:
-                    raise PdfReadError(f"Unknown xref type: {xref_type}")
+            # entries past the end of the data are not recorded
+            size = min(size, len(types) - pos)
+            if size <= 0:
+                continue
+            end = start + size
+            xref_types = types[pos : pos + size]
+            # The rest of the fields depend on the xref_type: the byte offset
+            # and generation of type 1 entries, the object stream number and
+            # index within it of type 2 ones
+            field_1 = fields_1[pos : pos + size]
+            field_2 = fields_2[pos : pos + size]
+            pos += size
+            if self.strict:
+                for xref_type in xref_types:
+                    if xref_type not in (0, 1, 2):
+                        raise PdfReadError(f"Unknown xref type: {xref_type}")
+            # We move backwards through the xrefs, don't replace any.
+            in_obj_stm = self.xref_objStm.present(start, end)
+            # type 1: objects that are in use but are not compressed
+            for generation in dict.fromkeys(
+                generation
+                for xref_type, generation in zip(xref_types, field_2)
+                if xref_type == 1
+            ):
+                if generation not in self.xref:
+                    self.xref[generation] = _XrefTable()
+                table = self.xref[generation]
+                mask = [
+                    xref_type == 1
+                    and entry_generation == generation
+                    and not (used or used_in_obj_stm)
+                    for xref_type, entry_generation, used, used_in_obj_stm in zip(
+                        xref_types,
+                        field_2,
+                        table.present(start, end),
+                        in_obj_stm,
+                    )
+                ]
+                if any(mask):
+                    table.assign(start, field_1, mask)
+            # type 2: compressed objects, generation 0 as of PDF spec table 18
+            if 2 in xref_types:
+                in_xref = (
+                    self.xref[0].present(start, end)
+                    if 0 in self.xref
+                    else [False] * size
+                )
+                mask = [
+                    xref_type == 2 and not (used or used_in_obj_stm)
+                    for xref_type, used, used_in_obj_stm in zip(
+                        xref_types, in_xref, in_obj_stm
+                    )
+                ]
+                if any(mask):
+                    self.xref_objStm.assign(start, field_1, field_2, mask)
 
     def _pairs(self, array: List[int]) -> Iterable[Tuple[int, int]]:
         i = 0
@@ -31,11 +31,13 @@ __author_email__ = "biziqe@mathieu.fenniak.net"
 
 import functools
 import logging
+import mmap
 import warnings
 from codecs import getencoder
 from dataclasses import dataclass
-from io import DEFAULT_BUFFER_SIZE
-from os import SEEK_CUR
+from io import DEFAULT_BUFFER_SIZE, BytesIO
+from os import SEEK_CUR, fstat
+from pathlib import Path
 from typing import (
     IO,
     Any,
@@ -235,6 +237,62 @@ def read_previous_line(stream: StreamType) -> bytes:
     return b"".join(line_content[::-1])
 
 
+class _MappedFile(mmap.mmap):
+    """
+    Read-only memory map that seeks like a ``BytesIO``.
+
+    A plain ``mmap`` raises ``ValueError`` when seeking past its end, which
+    would bypass the repair of damaged files that point past EOF. Seeks
+    beyond the end stop at the end instead, so the next read is empty.
+    """
+
+    def seek(self, pos: int, whence: int = 0) -> Any:
+        if whence == 1:
+            pos = max(pos + self.tell(), 0)
+        elif whence == 2:
+            pos = max(pos + len(self), 0)
+        return super().seek(min(pos, len(self)))
+
+
+def open_mapped_file(source: Union[str, Path, int]) -> StreamType:
+    """
+    Open a file for reading through a read-only memory map.
+
+    Only the pages that are actually read get loaded, so the file is never
+    copied into memory as a whole.
+
+    :param source: path of the file, or a file descriptor opened for reading.
+        The descriptor stays owned by the caller.
+    :return: a memory map, or an empty ``BytesIO`` for empty files, which
+        cannot be mapped.
+    """
+    if isinstance(source, int):
+        if fstat(source).st_size == 0:
+            return BytesIO()
+        return _MappedFile(source, 0, access=mmap.ACCESS_READ)  # type: ignore
+    with open(source, "rb") as fh:
+        return open_mapped_file(fh.fileno())
+
+
+def stream_buffer(stream: StreamType) -> Union[bytes, memoryview]:
+    """
+    Return the whole content of a stream, without copying it where possible.
+
+    Memory maps and in-memory streams are returned as a ``memoryview`` of
+    their data, other streams are read in full. The stream position is left
+    unchanged.
+    """
+    if isinstance(stream, mmap.mmap):
+        return memoryview(stream)  # type: ignore
+    if hasattr(stream, "getbuffer"):
+        return stream.getbuffer()  # type: ignore
+    pos = stream.tell()
+    stream.seek(0, 0)
+    buf = stream.read(-1)
+    stream.seek(pos, 0)
+    return buf
+
+
 def matrix_multiply(
     a: TransformationMatrixType, b: TransformationMatrixType
 ) -> TransformationMatrixType:
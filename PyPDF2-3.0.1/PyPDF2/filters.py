@@ -37,8 +37,9 @@ __author_email__ = "biziqe@mathieu.fenniak.net"
 import math
 import struct
 import zlib
+from functools import lru_cache
 from io import BytesIO
-from typing import Any, Dict, Optional, Tuple, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 from .generic import ArrayObject, DictionaryObject, IndirectObject, NameObject
 
@@ -49,7 +50,12 @@ except ImportError:
     # For older Python versions, the backport typing_extensions is necessary:
     from typing_extensions import Literal  # type: ignore[misc]
 
-from ._utils import b_, deprecate_with_replacement, ord_, paeth_predictor
+try:
+    import numpy as np  # type: ignore[import]  # only used to speed up PNG predictors when available
+except ImportError:
+    np = None  # type: ignore
+
+from ._utils import b_, deprecate_with_replacement
 from .constants import CcittFaxDecodeParameters as CCITT
 from .constants import ColorSpaces
 from .constants import FilterTypeAbbreviations as FTA
@@ -145,50 +151,106 @@ class FlateDecode:
         return str_data
 
     @staticmethod
-    def _decode_png_prediction(data: str, columns: int, rowlength: int) -> bytes:
-        output = BytesIO()
+    def _decode_png_prediction(data: bytes, columns: int, rowlength: int) -> bytes:
         # PNG prediction can vary from row to row
         if len(data) % rowlength != 0:
             raise PdfReadError("Image data is not rectangular")
-        prev_rowdata = (0,) * rowlength
-        for row in range(len(data) // rowlength):
-            rowdata = [
-                ord_(x) for x in data[(row * rowlength) : ((row + 1) * rowlength)]
-            ]
-            filter_byte = rowdata[0]
-
-            if filter_byte == 0:
-                pass
-            elif filter_byte == 1:
-                for i in range(2, rowlength):
-                    rowdata[i] = (rowdata[i] + rowdata[i - 1]) % 256
-            elif filter_byte == 2:
-                for i in range(1, rowlength):
-                    rowdata[i] = (rowdata[i] + prev_rowdata[i]) % 256
-            elif filter_byte == 3:
-                for i in range(1, rowlength):
-                    left = rowdata[i - 1] if i > 1 else 0
-                    floor = math.floor(left + prev_rowdata[i]) / 2
-                    rowdata[i] = (rowdata[i] + int(floor)) % 256
-            elif filter_byte == 4:
-                for i in range(1, rowlength):
-                    left = rowdata[i - 1] if i > 1 else 0
-                    up = prev_rowdata[i]
-                    up_left = prev_rowdata[i - 1] if i > 1 else 0
-                    paeth = paeth_predictor(left, up, up_left)
-                    rowdata[i] = (rowdata[i] + paeth) % 256
-            else:
-                # unsupported PNG filter
-                raise PdfReadError(f"Unsupported PNG filter {filter_byte!r}")
-            prev_rowdata = tuple(rowdata)
-            output.write(bytearray(rowdata[1:]))
-        return output.getvalue()
+        if np is not None:
+            return FlateDecode._decode_png_prediction_numpy(data, rowlength)
+        output = bytearray()
+        view = memoryview(data)
+        prev_rowdata: Union[bytes, bytearray] = bytes(rowlength - 1)
+        for start in range(0, len(data), rowlength):
+            rowdata = bytearray(view[start + 1 : start + rowlength])
+            _png_unfilter_row(data[start], rowdata, prev_rowdata)
+            output += rowdata
+            prev_rowdata = rowdata
+        return bytes(output)
+
+    @staticmethod
+    def _decode_png_prediction_numpy(data: bytes, rowlength: int) -> bytes:
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, rowlength)
+        filter_bytes = rows[:, 0]
+        pixels = rows[:, 1:].copy()
+        # uint8 arithmetic wraps around, which is the modulo 256 PNG asks for
+        if (filter_bytes == 2).all():
+            # all Up, as in most xref streams: a running sum down each column
+            np.cumsum(pixels, axis=0, dtype=np.uint8, out=pixels)
+        elif (filter_bytes == 1).all():
+            np.cumsum(pixels, axis=1, dtype=np.uint8, out=pixels)
+        elif (filter_bytes != 0).any():
+            prev_rowdata = np.zeros(rowlength - 1, dtype=np.uint8)
+            for rowdata, filter_byte in zip(pixels, filter_bytes.tolist()):
+                if filter_byte == 1:
+                    np.cumsum(rowdata, dtype=np.uint8, out=rowdata)
+                elif filter_byte == 2:
+                    rowdata += prev_rowdata
+                elif filter_byte != 0:
+                    # Average and Paeth depend on the decoded byte to the left
+                    row = bytearray(rowdata.tobytes())
+                    _png_unfilter_row(filter_byte, row, prev_rowdata.tobytes())
+                    rowdata[:] = np.frombuffer(row, dtype=np.uint8)
+                prev_rowdata = rowdata
+        return pixels.tobytes()
 
     @staticmethod
     def encode(data: bytes) -> bytes:
         return zlib.compress(data)
 
 
+@lru_cache(maxsize=16)
+def _byte_masks(length: int) -> Tuple[int, int]:
+    return int.from_bytes(b"\x7f" * length, "big"), int.from_bytes(b"\x80" * length, "big")
+
+
+def _png_unfilter_row(
+    filter_byte: int, rowdata: bytearray, prev_rowdata: Union[bytes, bytearray]
+) -> None:
+    """
+    Undo the PNG filter of one row in place.
+
+    The filter byte is not part of *rowdata*; *prev_rowdata* is the previous
+    decoded row, all zeros for the first one. Like the rest of this module
+    it works on single bytes, i.e. as if each pixel were one byte wide.
+    """
+    if filter_byte == 0:
+        pass
+    elif filter_byte == 1:
+        for i in range(1, len(rowdata)):
+            rowdata[i] = (rowdata[i] + rowdata[i - 1]) & 0xFF
+    elif filter_byte == 2:
+        # add all bytes at once as one big integer, keeping carries inside each byte
+        low7, high1 = _byte_masks(len(rowdata))
+        x = int.from_bytes(rowdata, "big")
+        up = int.from_bytes(prev_rowdata, "big")
+        rowdata[:] = (((x & low7) + (up & low7)) ^ ((x ^ up) & high1)).to_bytes(
+            len(rowdata), "big"
+        )
+    elif filter_byte == 3:
+        left = 0
+        for i, up in enumerate(prev_rowdata):
+            left = rowdata[i] = (rowdata[i] + ((left + up) >> 1)) & 0xFF
+    elif filter_byte == 4:
+        left = up_left = 0
+        for i, up in enumerate(prev_rowdata):
+            # paeth_predictor, inlined
+            p = left + up - up_left
+            dist_left = abs(p - left)
+            dist_up = abs(p - up)
+            dist_up_left = abs(p - up_left)
+            if dist_left <= dist_up and dist_left <= dist_up_left:
+                paeth = left
+            elif dist_up <= dist_up_left:
+                paeth = up
+            else:
+                paeth = up_left
+            left = rowdata[i] = (rowdata[i] + paeth) & 0xFF
+            up_left = up
+    else:
+        # unsupported PNG filter
+        raise PdfReadError(f"Unsupported PNG filter {filter_byte!r}")
+
+
 class ASCIIHexDecode:
     """
     The ASCIIHexDecode filter decodes data that has been encoded in ASCII
@@ -243,12 +305,15 @@ class LZWDecode:
         def __init__(self, data: bytes) -> None:
             self.STOP = 257
             self.CLEARDICT = 256
-            self.data = data
+            self.data = b_(data)
+            # a code is at most 12 bits wide, so it always fits in the 3 bytes
+            # from its first one; the padding keeps that true at the end of data
+            self._padded_data = self.data + b"\0\0"
             self.bytepos = 0
             self.bitpos = 0
-            self.dict = [""] * 4096
+            self.dict = [b""] * 4096
             for i in range(256):
-                self.dict[i] = chr(i)
+                self.dict[i] = bytes((i,))
             self.reset_dict()
 
         def reset_dict(self) -> None:
@@ -256,26 +321,18 @@ class LZWDecode:
             self.bitspercode = 9
 
         def next_code(self) -> int:
-            fillbits = self.bitspercode
-            value = 0
-            while fillbits > 0:
-                if self.bytepos >= len(self.data):
-                    return -1
-                nextbits = ord_(self.data[self.bytepos])
-                bitsfromhere = 8 - self.bitpos
-                bitsfromhere = min(bitsfromhere, fillbits)
-                value |= (
-                    (nextbits >> (8 - self.bitpos - bitsfromhere))
-                    & (0xFF >> (8 - bitsfromhere))
-                ) << (fillbits - bitsfromhere)
-                fillbits -= bitsfromhere
-                self.bitpos += bitsfromhere
-                if self.bitpos >= 8:
-                    self.bitpos = 0
-                    self.bytepos = self.bytepos + 1
+            start = self.bytepos * 8 + self.bitpos
+            stop = start + self.bitspercode
+            if stop > len(self.data) * 8:
+                return -1
+            chunk = self._padded_data[self.bytepos : self.bytepos + 3]
+            shift = 24 - self.bitpos - self.bitspercode
+            mask = (1 << self.bitspercode) - 1
+            value = (int.from_bytes(chunk, "big") >> shift) & mask
+            self.bytepos, self.bitpos = divmod(stop, 8)
             return value
 
-        def decode(self) -> str:
+        def decode(self) -> bytes:
             """
             TIFF 6.0 specification explains in sufficient details the steps to
             implement the LZW encode() and decode() algorithms.
@@ -287,42 +344,55 @@ class LZWDecode:
             :raises PdfReadError: If the stop code is missing
             """
             cW = self.CLEARDICT
-            baos = ""
+            baos: List[bytes] = []
+            entries = self.dict
+            data = self._padded_data
+            end = len(self.data) * 8
+            pos = self.bytepos * 8 + self.bitpos
+            dictlen = self.dictlen
+            bitspercode = self.bitspercode
+            stop_code, clear_code = self.STOP, self.CLEARDICT
             while True:
                 pW = cW
-                cW = self.next_code()
-                if cW == -1:
+                # inlined next_code(), with the bit position kept in pos
+                nextpos = pos + bitspercode
+                if nextpos > end:
                     raise PdfReadError("Missed the stop code in LZWDecode!")
-                if cW == self.STOP:
+                cW = (
+                    int.from_bytes(data[pos >> 3 : (pos >> 3) + 3], "big")
+                    >> (24 - (pos & 7) - bitspercode)
+                ) & ((1 << bitspercode) - 1)
+                pos = nextpos
+                if cW == stop_code:
                     break
-                elif cW == self.CLEARDICT:
-                    self.reset_dict()
-                elif pW == self.CLEARDICT:
-                    baos += self.dict[cW]
+                elif cW == clear_code:
+                    dictlen = 258
+                    bitspercode = 9
+                elif pW == clear_code:
+                    baos.append(entries[cW])
                 else:
-                    if cW < self.dictlen:
-                        baos += self.dict[cW]
-                        p = self.dict[pW] + self.dict[cW][0]
-                        self.dict[self.dictlen] = p
-                        self.dictlen += 1
+                    if cW < dictlen:
+                        entry = entries[cW]
+                        baos.append(entry)
+                        entries[dictlen] = entries[pW] + entry[:1]
                     else:
-                        p = self.dict[pW] + self.dict[pW][0]
-                        baos += p
-                        self.dict[self.dictlen] = p
-                        self.dictlen += 1
-                    if (
-                        self.dictlen >= (1 << self.bitspercode) - 1
-                        and self.bitspercode < 12
-                    ):
-                        self.bitspercode += 1
-            return baos
+                        p = entries[pW]
+                        if not p:
+                            raise PdfReadError(f"Invalid code {cW} in LZWDecode")
+                        p += p[:1]
+                        baos.append(p)
+                        entries[dictlen] = p
+                    dictlen += 1
+                    if dictlen >= (1 << bitspercode) - 1 and bitspercode < 12:
+                        bitspercode += 1
+            return b"".join(baos)
 
     @staticmethod
     def decode(
         data: bytes,
         decode_parms: Union[None, ArrayObject, DictionaryObject] = None,
         **kwargs: Any,
-    ) -> str:
+    ) -> bytes:
         """
         :param data: ``bytes`` or ``str`` text to decode.
         :param decode_parms: a dictionary of parameter values.
@@ -334,6 +404,12 @@ class LZWDecode:
         return LZWDecode.Decoder(data).decode()
 
 
+_ASCII85_IGNORED = bytes(
+    c for c in range(256) if not (ord("!") <= c <= ord("u") or c == ord("z"))
+)
+_ASCII85_DIGITS = bytes((c - ord("!")) % 256 for c in range(256))
+
+
 class ASCII85Decode:
     """Decodes string ASCII85-encoded data into a byte format."""
 
@@ -348,25 +424,27 @@ class ASCII85Decode:
             decode_parms = kwargs["decodeParms"]  # noqa: F841
         if isinstance(data, str):
             data = data.encode("ascii")
-        group_index = b = 0
-        out = bytearray()
-        for char in data:
-            if ord("!") <= char and char <= ord("u"):
-                group_index += 1
-                b = b * 85 + (char - 33)
-                if group_index == 5:
-                    out += struct.pack(b">L", b)
-                    group_index = b = 0
-            elif char == ord("z"):
-                assert group_index == 0
-                out += b"\0\0\0\0"
-            elif char == ord("~"):
-                if group_index:
-                    for _ in range(5 - group_index):
-                        b = b * 85 + 84
-                    out += struct.pack(b">L", b)[: group_index - 1]
-                break
-        return bytes(out)
+        # the data ends at the "~>" marker; anything else outside the ASCII85
+        # alphabet (whitespace in particular) is skipped
+        data, end_marker, _ = data.partition(b"~")
+        runs = data.translate(None, _ASCII85_IGNORED).split(b"z")
+        # "z" stands for a whole group of zeros, so it only may come between groups
+        assert all(len(run) % 5 == 0 for run in runs[:-1])
+        data = b"!!!!!".join(runs)
+        if end_marker:
+            # a final partial group is padded with "u" and its padding bytes dropped
+            padding = -len(data) % 5
+        else:
+            # without the marker, a final partial group is never completed
+            data = data[: len(data) - len(data) % 5]
+            padding = 0
+        digits = data.translate(_ASCII85_DIGITS) + b"\x54" * padding
+        groups = [
+            (((c1 * 85 + c2) * 85 + c3) * 85 + c4) * 85 + c5
+            for c1, c2, c3, c4, c5 in zip(*[iter(digits)] * 5)
+        ]
+        out = struct.pack(f">{len(groups)}L", *groups)
+        return out[: len(out) - padding]
 
 
 class DCTDecode:
@@ -526,7 +604,7 @@ def decode_stream_data(stream: Any) -> Union[str, bytes]:  # utils.StreamObject
             elif filter_type in (FT.ASCII_HEX_DECODE, FTA.AHx):
                 data = ASCIIHexDecode.decode(data)  # type: ignore
             elif filter_type in (FT.LZW_DECODE, FTA.LZW):
-                data = LZWDecode.decode(data, stream.get(SA.DECODE_PARMS))  # type: ignore
+                data = LZWDecode.decode(data, stream.get(SA.DECODE_PARMS))
             elif filter_type in (FT.ASCII_85_DECODE, FTA.A85):
                 data = ASCII85Decode.decode(data)
             elif filter_type == FT.DCT_DECODE:
@@ -31,8 +31,21 @@ __author_email__ = "biziqe@mathieu.fenniak.net"
 
 import logging
 import re
+from binascii import unhexlify
 from io import BytesIO
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 from .._protocols import PdfWriterProtocol
 from .._utils import (
@@ -44,7 +57,6 @@ from .._utils import (
     hex_str,
     logger_warning,
     read_non_whitespace,
-    read_until_regex,
     skip_over_comment,
 )
 from ..constants import (
@@ -68,12 +80,39 @@ from ._base import (
     TextStringObject,
 )
 from ._fit import Fit
-from ._utils import read_hex_string_from_stream, read_string_from_stream
+from ._utils import (
+    create_string_object,
+    read_hex_string_from_stream,
+    read_string_from_stream,
+)
 
 logger = logging.getLogger(__name__)
 NumberSigns = b"+-"
 IndirectPattern = re.compile(rb"[+-]?(\d+)\s+(\d+)\s+R[^a-zA-Z]")
 
+# Content stream lexer, see ContentStream.__parse_content_stream.
+# Each alternative only matches what the stream-based readers would read the
+# same way; anything else (comments, dictionaries, escaped or nested strings,
+# names with #xx, indirect references, ...) is left to read_object.
+_CONTENT_OPERAND = (
+    rb"(?P<num>(?![+-]?\d+\s+\d+\s+R[^a-zA-Z])[+\-.0-9][+,\-.0-9]*(?=[^+,\-.0-9]))"
+    rb"|(?P<name>/[^\s()<>\[\]{}/%#]*(?=[\s()<>\[\]{}/%]|\Z))"
+    rb"|\((?P<str>[^()\\]*)\)"
+    rb"|<(?P<hex>[0-9A-Fa-f]*)>"
+    rb"|(?P<arr>\[)"
+)
+# operators and operands, after whitespace as skipped by read_non_whitespace
+_CONTENT_TOKEN = re.compile(
+    rb"[ \n\r\t\x00]*(?:(?P<op>[A-Za-z'\"][^\s()<>\[\]{}/%]*)|" + _CONTENT_OPERAND + rb")"
+)
+# array items, after whitespace as skipped by ArrayObject.read_from_stream
+_ARRAY_TOKEN = re.compile(rb"[ \t\n\r\x0b\x0c]*(?:(?P<close>\])|" + _CONTENT_OPERAND + rb")")
+_CONTENT_WHITESPACE = re.compile(rb"[ \n\r\t\x00]*")
+_ARRAY_WHITESPACE = re.compile(rb"[ \t\n\r\x0b\x0c]*")
+_END_OF_LINE = re.compile(rb"[\r\n]")
+# same end-of-image rule as _read_inline_image: EI with whitespace on both sides
+_INLINE_IMAGE_END = re.compile(rb"[ \n\r\t\x00]EI[ \n\r\t\x00]")
+
 
 class ArrayObject(list, PdfObject):
     def clone(
@@ -855,26 +894,68 @@ class ContentStream(DecodedStreamObject):
         # The inner list has two elements:
         #  [0] : List
         #  [1] : str
-        self.operations: List[Tuple[Any, Any]] = []
+        self._operations: Optional[List[Tuple[Any, Any]]] = []
+        # decoded stream data, until it has been parsed into _operations
+        self._content: Optional[bytes] = None
 
         # stream may be a StreamObject or an ArrayObject containing
         # multiple StreamObjects to be cat'd together.
         if stream is not None:
             stream = stream.get_object()
             if isinstance(stream, ArrayObject):
-                data = b""
-                for s in stream:
-                    data += b_(s.get_object().get_data())
-                    if len(data) == 0 or data[-1] != b"\n":
-                        data += b"\n"
-                stream_bytes = BytesIO(data)
+                data = b"".join(
+                    b_(s.get_object().get_data()) + b"\n" for s in stream
+                )
             else:
                 stream_data = stream.get_data()
                 assert stream_data is not None
-                stream_data_bytes = b_(stream_data)
-                stream_bytes = BytesIO(stream_data_bytes)
+                data = b_(stream_data)
             self.forced_encoding = forced_encoding
-            self.__parse_content_stream(stream_bytes)
+            self._operations = None
+            self._content = data
+
+    @property
+    def operations(self) -> List[Tuple[Any, Any]]:
+        """
+        The list of (operands, operator) pairs of this content stream.
+
+        The stream data is only parsed when this is first accessed. Use
+        :meth:`iter_operations` to walk the operations without building
+        the whole list.
+        """
+        if self._operations is None:
+            self._operations = list(self.__parse_content_stream(self._content))  # type: ignore
+            self._content = None
+        return self._operations
+
+    @operations.setter
+    def operations(self, value: List[Tuple[Any, Any]]) -> None:
+        self._operations = value
+        self._content = None
+
+    def iter_operations(
+        self, operators: Optional[Container[bytes]] = None
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Iterate over the (operands, operator) pairs of this content stream.
+
+        If :attr:`operations` has not been built yet, the pairs are parsed
+        from the stream data as they are consumed and nothing is kept, so
+        memory stays flat on very large pages. Each call parses again in
+        that case; use :attr:`operations` when random access or several
+        passes are needed.
+
+        :param operators: If given, only operations whose operator is in
+            this collection are returned. The operands of all other
+            operators are tokenized but no objects are built for them, and
+            inline image data is skipped over unless ``b"INLINE IMAGE"``
+            is one of the operators.
+        """
+        if self._operations is not None:
+            if operators is None:
+                return iter(self._operations)
+            return (op for op in self._operations if op[1] in operators)
+        return self.__parse_content_stream(self._content, operators)  # type: ignore
 
     def clone(
         self,
@@ -912,39 +993,154 @@ class ContentStream(DecodedStreamObject):
         # super(DictionaryObject,self)._clone(src, pdf_dest, force_duplicate, ignore_fields)
         return
 
-    def __parse_content_stream(self, stream: StreamType) -> None:
-        stream.seek(0, 0)
-        operands: List[Union[int, str, PdfObject]] = []
+    def __parse_content_stream(
+        self, data: bytes, operators: Optional[Container[bytes]] = None
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Tokenize the decoded content stream, yielding (operands, operator) pairs.
+
+        The bytes are scanned in place with compiled regexes and index
+        arithmetic instead of one ``stream.read(1)`` at a time. Tokens the
+        lexer has no pattern for, and inline images, are handed to the
+        stream-based readers at the same offset, so the operations are the
+        same as read_object would produce.
+
+        With *operators*, matched operands are kept as regex matches and only
+        turned into objects once their operator turns out to be wanted.
+        """
+        stream = BytesIO(data)  # shares the buffer; only used for fallbacks
+        operands: List[Any] = []
+        deferred = operators is not None
+        next_token = _CONTENT_TOKEN.match
+        end = len(data)
+        pos = 0
         while True:
-            peek = read_non_whitespace(stream)
-            if peek == b"" or peek == 0:
-                break
-            stream.seek(-1, 1)
-            if peek.isalpha() or peek in (b"'", b'"'):
-                operator = read_until_regex(stream, NameObject.delimiter_pattern, True)
+            m = next_token(data, pos)
+            if m is None:
+                whitespace = _CONTENT_WHITESPACE.match(data, pos)
+                assert whitespace is not None  # the pattern also matches ""
+                pos = whitespace.end()
+                if pos >= end:
+                    break
+                if data[pos] == 0x25:  # %
+                    # If we encounter a comment in the content stream, we have to
+                    # handle it here.  Typically, read_object will handle
+                    # encountering a comment -- but read_object assumes that
+                    # following the comment must be the object we're trying to
+                    # read.  In this case, it could be an operator instead.
+                    eol = _END_OF_LINE.search(data, pos)
+                    pos = eol.end() if eol is not None else end
+                else:
+                    stream.seek(pos)
+                    operands.append(read_object(stream, None, self.forced_encoding))
+                    pos = stream.tell()
+                continue
+            # every alternative of the token patterns is a named group
+            kind = cast(str, m.lastgroup)
+            if kind == "op":
+                operator = m.group(kind)
+                pos = m.end()
                 if operator == b"BI":
                     # begin inline image - a completely different parsing
                     # mechanism is required, of course... thanks buddy...
                     assert operands == []
+                    stream.seek(pos)
+                    if deferred and b"INLINE IMAGE" not in operators:  # type: ignore
+                        pos = self._skip_inline_image(data, stream)
+                        continue
                     ii = self._read_inline_image(stream)
-                    self.operations.append((ii, b"INLINE IMAGE"))
+                    pos = stream.tell()
+                    yield ii, b"INLINE IMAGE"
+                elif not deferred:
+                    yield operands, operator
+                    operands = []
                 else:
-                    self.operations.append((operands, operator))
+                    if operator in operators:  # type: ignore
+                        yield [
+                            self._operand_from_match(o, cast(str, o.lastgroup))
+                            if isinstance(o, Match)
+                            else o
+                            for o in operands
+                        ], operator
                     operands = []
-            elif peek == b"%":
-                # If we encounter a comment in the content stream, we have to
-                # handle it here.  Typically, read_object will handle
-                # encountering a comment -- but read_object assumes that
-                # following the comment must be the object we're trying to
-                # read.  In this case, it could be an operator instead.
-                while peek not in (b"\r", b"\n"):
-                    peek = stream.read(1)
+            elif kind == "arr":
+                arr, pos = self._read_array(data, m.start(kind), stream)
+                operands.append(arr)
+            elif deferred:
+                operands.append(m)
+                pos = m.end()
+            elif kind == "num":
+                value = m.group(kind)
+                operands.append(
+                    FloatObject(value) if value.find(b".") != -1 else NumberObject(value)
+                )
+                pos = m.end()
+            else:
+                operands.append(self._operand_from_match(m, kind))
+                pos = m.end()
+
+    def _operand_from_match(self, m: Any, kind: str) -> PdfObject:
+        value = m.group(kind)
+        if kind == "num":
+            if value.find(b".") != -1:
+                return FloatObject(value)
+            return NumberObject(value)
+        if kind == "name":
+            try:
+                return NameObject(value.decode("utf-8"))
+            except UnicodeDecodeError:
+                # let NameObject.read_from_stream deal with the other encodings
+                stream = BytesIO(value)
+                return NameObject.read_from_stream(stream, None)
+        if kind == "hex":
+            if len(value) % 2:
+                value += b"0"
+            value = unhexlify(value)
+        return create_string_object(value, self.forced_encoding)
+
+    def _read_array(
+        self, data: bytes, start: int, stream: StreamType
+    ) -> Tuple[ArrayObject, int]:
+        """Read the array starting at data[start]; return it and the offset after it."""
+        arr = ArrayObject()
+        next_item = _ARRAY_TOKEN.match
+        pos = start + 1
+        while True:
+            m = next_item(data, pos)
+            if m is None:
+                whitespace = _ARRAY_WHITESPACE.match(data, pos)
+                assert whitespace is not None  # the pattern also matches ""
+                pos = whitespace.end()
+                if pos >= len(data):
+                    # unterminated: let ArrayObject.read_from_stream report it
+                    stream.seek(start)
+                    return ArrayObject.read_from_stream(stream, None, self.forced_encoding), stream.tell()
+                stream.seek(pos)
+                arr.append(read_object(stream, None, self.forced_encoding))
+                pos = stream.tell()
+                continue
+            # every alternative of the token patterns is a named group
+            kind = cast(str, m.lastgroup)
+            if kind == "close":
+                return arr, m.end()
+            if kind == "arr":
+                item, pos = self._read_array(data, m.start(kind), stream)
+                arr.append(item)
             else:
-                operands.append(read_object(stream, None, self.forced_encoding))
+                arr.append(self._operand_from_match(m, kind))
+                pos = m.end()
 
-    def _read_inline_image(self, stream: StreamType) -> Dict[str, Any]:
-        # begin reading just after the "BI" - begin image
-        # first read the dictionary of settings.
+    def _skip_inline_image(self, data: bytes, stream: StreamType) -> int:
+        """Skip the inline image after BI without reading its data; return the offset after EI."""
+        self._read_inline_image_settings(stream)
+        tmp = stream.read(3)
+        assert tmp[:2] == b"ID"
+        m = _INLINE_IMAGE_END.search(data, stream.tell())
+        if m is None:
+            raise PdfReadError("Unexpected end of stream")
+        return m.end()
+
+    def _read_inline_image_settings(self, stream: StreamType) -> DictionaryObject:
         settings = DictionaryObject()
         while True:
             tok = read_non_whitespace(stream)
@@ -958,6 +1154,12 @@ class ContentStream(DecodedStreamObject):
             value = read_object(stream, self.pdf)
             settings[key] = value
         # left at beginning of ID
+        return settings
+
+    def _read_inline_image(self, stream: StreamType) -> Dict[str, Any]:
+        # begin reading just after the "BI" - begin image
+        # first read the dictionary of settings.
+        settings = self._read_inline_image_settings(stream)
         tmp = stream.read(3)
         assert tmp[:2] == b"ID"
         data = BytesIO()
@@ -1024,7 +1226,7 @@ class ContentStream(DecodedStreamObject):
 
     @_data.setter
     def _data(self, value: Union[str, bytes]) -> None:
-        self.__parse_content_stream(BytesIO(b_(value)))
+        self.operations.extend(self.__parse_content_stream(b_(value)))
 
 
 def read_object(
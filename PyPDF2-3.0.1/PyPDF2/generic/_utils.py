@@ -1,11 +1,47 @@
 import codecs
+import re
+from binascii import unhexlify
 from typing import Dict, List, Tuple, Union
 
 from .._codecs import _pdfdoc_encoding
-from .._utils import StreamType, b_, logger_warning, read_non_whitespace
+from .._utils import WHITESPACES, StreamType, b_, logger_warning
 from ..errors import STREAM_TRUNCATED_PREMATURELY, PdfStreamError
 from ._base import ByteStringObject, TextStringObject
 
+# bytes ending a literal string, or escaping the one after them
+_STRING_DELIMITER = re.compile(rb"[()\\]")
+# "The number ddd may consist of one, two, or three octal digits; high-order
+# overflow shall be ignored. Three octal digits shall be used, with leading
+# zeros as needed, if the next character of the string is also a digit."
+# (PDF reference 7.3.4.2, p 16)
+# A backslash followed by a line break escapes it, whether it is one or two
+# characters long.
+_STRING_ESCAPE = re.compile(rb"\\([0-7]{1,3}|[\r\n][\r\n]?|.)", re.DOTALL)
+_STRING_ESCAPES = {
+    b"n": b"\n",
+    b"r": b"\r",
+    b"t": b"\t",
+    b"b": b"\b",
+    b"f": b"\f",
+    b"c": rb"\c",
+    b"(": b"(",
+    b")": b")",
+    b"/": b"/",
+    b"\\": b"\\",
+    b" ": b" ",
+    b"%": b"%",
+    b"<": b"<",
+    b">": b">",
+    b"[": b"[",
+    b"]": b"]",
+    b"#": b"#",
+    b"_": b"_",
+    b"&": b"&",
+    b"$": b"$",
+}
+# white-space characters, PDF reference table 1
+_HEX_STRING_WHITESPACE = b"".join(WHITESPACES) + b"\x0c"
+
 
 def hex_to_rgb(value: str) -> Tuple[float, float, float]:
     return tuple(int(value.lstrip("#")[i : i + 2], 16) / 255.0 for i in (0, 2, 4))  # type: ignore
@@ -16,98 +52,78 @@ def read_hex_string_from_stream(
     forced_encoding: Union[None, str, List[str], Dict[int, str]] = None,
 ) -> Union["TextStringObject", "ByteStringObject"]:
     stream.read(1)
-    txt = ""
-    x = b""
+    data = b""
+    size = 64
     while True:
-        tok = read_non_whitespace(stream)
-        if not tok:
+        chunk = stream.read(size)
+        if not chunk:
             raise PdfStreamError(STREAM_TRUNCATED_PREMATURELY)
-        if tok == b">":
+        end = chunk.find(b">")
+        if end != -1:
+            # leave the stream right after the closing >
+            stream.seek(end + 1 - len(chunk), 1)
+            data += chunk[:end]
             break
-        x += tok
-        if len(x) == 2:
-            txt += chr(int(x, base=16))
-            x = b""
-    if len(x) == 1:
-        x += b"0"
-    if len(x) == 2:
-        txt += chr(int(x, base=16))
-    return create_string_object(b_(txt), forced_encoding)
+        data += chunk
+        size *= 2
+    data = data.translate(None, _HEX_STRING_WHITESPACE)
+    if len(data) % 2:
+        data += b"0"
+    return create_string_object(unhexlify(data), forced_encoding)
+
+
+def _unescape(match: "re.Match[bytes]") -> bytes:
+    tok = match.group(1)
+    if tok in _STRING_ESCAPES:
+        return _STRING_ESCAPES[tok]
+    if b"0" <= tok[:1] <= b"7":
+        return b_(chr(int(tok, base=8)))
+    if tok[0] in b"\n\r":
+        # Don't add anything to the actual string, since this line break
+        # was escaped
+        return b""
+    msg = rf"Unexpected escaped string: {tok.decode('utf8')}"
+    logger_warning(msg, __name__)
+    return tok
 
 
 def read_string_from_stream(
     stream: StreamType,
     forced_encoding: Union[None, str, List[str], Dict[int, str]] = None,
 ) -> Union["TextStringObject", "ByteStringObject"]:
-    tok = stream.read(1)
+    stream.read(1)
+    data = b""
     parens = 1
-    txt = []
-    while True:
-        tok = stream.read(1)
-        if not tok:
+    pos = 0  # where to look for the next delimiter in data
+    size = 64
+    while parens:
+        chunk = stream.read(size)
+        if not chunk:
             raise PdfStreamError(STREAM_TRUNCATED_PREMATURELY)
-        if tok == b"(":
-            parens += 1
-        elif tok == b")":
-            parens -= 1
-            if parens == 0:
-                break
-        elif tok == b"\\":
-            tok = stream.read(1)
-            escape_dict = {
-                b"n": b"\n",
-                b"r": b"\r",
-                b"t": b"\t",
-                b"b": b"\b",
-                b"f": b"\f",
-                b"c": rb"\c",
-                b"(": b"(",
-                b")": b")",
-                b"/": b"/",
-                b"\\": b"\\",
-                b" ": b" ",
-                b"%": b"%",
-                b"<": b"<",
-                b">": b">",
-                b"[": b"[",
-                b"]": b"]",
-                b"#": b"#",
-                b"_": b"_",
-                b"&": b"&",
-                b"$": b"$",
-            }
-            try:
-                tok = escape_dict[tok]
-            except KeyError:
-                if b"0" <= tok and tok <= b"7":
-                    # "The number ddd may consist of one, two, or three
-                    # octal digits; high-order overflow shall be ignored.
-                    # Three octal digits shall be used, with leading zeros
-                    # as needed, if the next character of the string is also
-                    # a digit." (PDF reference 7.3.4.2, p 16)
-                    for _ in range(2):
-                        ntok = stream.read(1)
-                        if b"0" <= ntok and ntok <= b"7":
-                            tok += ntok
-                        else:
-                            stream.seek(-1, 1)  # ntok has to be analysed
-                            break
-                    tok = b_(chr(int(tok, base=8)))
-                elif tok in b"\n\r":
-                    # This case is  hit when a backslash followed by a line
-                    # break occurs.  If it's a multi-char EOL, consume the
-                    # second character:
-                    tok = stream.read(1)
-                    if tok not in b"\n\r":
-                        stream.seek(-1, 1)
-                    # Then don't add anything to the actual string, since this
-                    # line break was escaped:
-                    tok = b""
-                else:
-                    msg = rf"Unexpected escaped string: {tok.decode('utf8')}"
-                    logger_warning(msg, __name__)
-        txt.append(tok)
-    return create_string_object(b"".join(txt), forced_encoding)
+        data += chunk
+        size *= 2
+        for m in _STRING_DELIMITER.finditer(data, pos):
+            i = m.start()
+            if i < pos:
+                continue  # escaped by the previous backslash
+            pos = i + 1
+            tok = data[i]
+            if tok == 0x5C:  # \
+                pos += 1
+            elif tok == 0x28:  # (
+                parens += 1
+            else:
+                parens -= 1
+                if parens == 0:
+                    break
+        else:
+            pos = max(pos, len(data))
+    # leave the stream right after the closing parenthesis
+    stream.seek(pos - len(data), 1)
+    txt = data[: pos - 1]
+    if b"\\" in txt:
+        txt = _STRING_ESCAPE.sub(_unescape, txt)
+    return create_string_object(txt, forced_encoding)
 
 
 def create_string_object(
@@ -125,13 +141,13 @@ def create_string_object(
         return TextStringObject(string)
     elif isinstance(string, bytes):
         if isinstance(forced_encoding, (list, dict)):
-            out = ""
+            out = []
             for x in string:
                 try:
-                    out += forced_encoding[x]
+                    out.append(forced_encoding[x])
                 except Exception:
-                    out += bytes((x,)).decode("charmap")
-            return TextStringObject(out)
+                    out.append(bytes((x,)).decode("charmap"))
+            return TextStringObject("".join(out))
         elif isinstance(forced_encoding, str):
             if forced_encoding == "bytes":
                 return ByteStringObject(string)
@@ -157,16 +173,15 @@ def create_string_object(
 
 
 def decode_pdfdocencoding(byte_array: bytes) -> str:
-    retval = ""
-    for b in byte_array:
-        c = _pdfdoc_encoding[b]
-        if c == "\u0000":
-            raise UnicodeDecodeError(
-                "pdfdocencoding",
-                bytearray(b),
-                -1,
-                -1,
-                "does not exist in translation table",
-            )
-        retval += c
+    # every byte maps to one character; latin-1 keeps the byte values as is
+    retval = byte_array.decode("latin-1").translate(_pdfdoc_encoding)
+    if "\u0000" in retval:
+        b = byte_array[retval.index("\u0000")]
+        raise UnicodeDecodeError(
+            "pdfdocencoding",
+            bytearray(b),
+            -1,
+            -1,
+            "does not exist in translation table",
+        )
     return retval
@@ -3,17 +3,45 @@ warnings.filterwarnings("ignore", category=SyntaxWarning)
 
 import logging
 import time
-from flask import Flask, request, send_file, jsonify, send_from_directory
+import io
+import threading
+import uuid
+import hashlib
+import base64
+import itertools
+import urllib.request
+import json
+import queue
+import atexit
+import re
+import random
+import contextlib
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask, Response, request, send_file, jsonify, send_from_directory
 from flask_cors import CORS
+import jwt
 from PyPDF2 import PdfReader
 from PyPDF2.errors import PdfReadError
+from pdf_worker import extract_page_range
 from deep_translator import GoogleTranslator
-from gtts import gTTS
+from deep_translator.exceptions import TooManyRequests
+from gtts import gTTS, gTTSError
+import requests
 import speech_recognition as sr
 from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
 import tempfile
+import shutil
 import os
+import subprocess
 from supabase import create_client, Client
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -31,8 +59,22 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 # Constants
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-MAX_TEXT_LENGTH = 5000  # Max chars for translation/TTS
+MAX_TEXT_LENGTH = 5000  # Max chars per translation request
+MAX_DOCUMENT_LENGTH = int(os.getenv('MAX_DOCUMENT_LENGTH', 100000))  # Max chars processed per document
+MAX_TTS_LENGTH = int(os.getenv('MAX_TTS_LENGTH', 5000))  # Max chars read aloud per request
 VALID_STT_LANGS = ['en-US', 'fr-FR', 'es-ES', 'de-DE', 'my-MM']
+STT_SAMPLE_RATE = 16000
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFMPEG_TIMEOUT = 60
+STT_SEGMENT_MAX_MS = int(os.getenv('STT_SEGMENT_MAX_MS', 30000))  # The legacy Google endpoint only takes short utterances
+STT_MIN_SILENCE_MS = 400  # Pause length that counts as a break between utterances
+STT_SILENCE_OFFSET_DB = 16  # Anything this far below the clip's average loudness is silence
+STT_SEEK_STEP_MS = 10
+STT_PADDING_MS = 200
+STT_WORKERS = int(os.getenv('STT_WORKERS', 4))
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', os.cpu_count() or 1))  # Processes for page text extraction, 1 disables
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 8))  # Smaller documents aren't worth the fan-out
+PDF_PAGE_BATCH = 4  # Pages per worker task, small enough to stop soon after the text budget is met
 
 INDEX_HTML = """
 <!DOCTYPE html>
@@ -626,31 +668,18 @@ INDEX_HTML = """
           return;
         }
 
-        // Log to history table
-        const { data: { session } } = await supabase.auth.getSession();
-        const historyEntry = {
-          user_id: session.user.id,
-          mode: m,
-          input_file: m.startsWith('pdf') ? pdfFileInput.files[0]?.name : audioFileInput.files[0]?.name,
-          target_language: m !== 'pdf_audio' && m !== 'audio_text' ? lang : null,
-          stt_language: m.startsWith('audio') ? sttLang : null
-        };
-
+        // History is recorded server-side
         if (m === 'pdf_audio' || m === 'pdf_translate_audio' || m === 'audio_audio') {
           const blob = await res.blob();
           const url = URL.createObjectURL(blob);
           player.src = url;
           player.classList.remove('hidden');
-          historyEntry.output_result = 'Audio output';
         } else {
           const data = await res.json();
           const text = data.translated_text || data.text || JSON.stringify(data);
           outputText.value = text;
           outputText.classList.remove('hidden');
-          historyEntry.output_result = text;
         }
-
-        await supabase.from('history').insert(historyEntry);
       } catch (e) {
         alert(`Network error: ${e.message}`);
       }
@@ -686,6 +715,88 @@ def debug_env():
         'PORT': os.getenv('PORT')
     })
 
+# Hit/miss counters for sizing the result cache
+@app.route('/cache-stats')
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+# JWT verification
+SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')  # Legacy HS256 secret; asymmetric keys come from JWKS
+SUPABASE_JWKS_URL = f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+JWKS_REFRESH_INTERVAL = int(os.getenv('JWKS_REFRESH_INTERVAL', 600))
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 1024))
+JWT_AUDIENCE = 'authenticated'
+JWT_ALGORITHMS = ('HS256', 'RS256', 'ES256')
+
+class UnverifiableToken(Exception):
+    pass
+
+class TokenVerifier:
+    def __init__(self, secret: str, jwks_url: str, cache_size: int, jwks_refresh: int):
+        self._secret = secret
+        self._jwks_client = jwt.PyJWKClient(jwks_url, cache_jwk_set=True, lifespan=jwks_refresh, timeout=5)
+        self._cache = OrderedDict()  # token -> (user_id, exp), least recently used first
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> str:
+        user_id = self._cached(token)
+        if user_id:
+            return user_id
+        try:
+            claims = self._decode(token)
+            user_id = claims['sub']
+        except UnverifiableToken as e:
+            logging.debug(f"Falling back to Supabase get_user: {e}")
+            user_id = self._verify_remote(token)
+            claims = jwt.decode(token, options={'verify_signature': False})
+        if 'exp' in claims:
+            self._remember(token, user_id, claims['exp'])
+        return user_id
+
+    def _decode(self, token: str) -> dict:
+        alg = jwt.get_unverified_header(token).get('alg')
+        if alg not in JWT_ALGORITHMS:
+            raise jwt.InvalidAlgorithmError(f"Unsupported algorithm: {alg}")
+        if alg == 'HS256':
+            if not self._secret:
+                raise UnverifiableToken("SUPABASE_JWT_SECRET is not set")
+            key = self._secret
+        else:
+            try:
+                key = self._jwks_client.get_signing_key_from_jwt(token).key
+            except (jwt.PyJWKClientError, jwt.PyJWKError, jwt.PyJWKSetError) as e:
+                raise UnverifiableToken(str(e))
+        return jwt.decode(token, key, algorithms=[alg], audience=JWT_AUDIENCE, options={'require': ['exp', 'sub']})
+
+    def _verify_remote(self, token: str) -> str:
+        response = supabase.auth.get_user(token)
+        logging.debug(f"Supabase get_user response: {response}")
+        if not response.user:
+            raise jwt.InvalidTokenError("user not found")
+        return response.user.id
+
+    def _cached(self, token: str):
+        with self._lock:
+            entry = self._cache.get(token)
+            if not entry:
+                return None
+            user_id, exp = entry
+            if exp <= time.time():
+                del self._cache[token]
+                return None
+            self._cache.move_to_end(token)
+            return user_id
+
+    def _remember(self, token: str, user_id: str, exp: int):
+        with self._lock:
+            self._cache[token] = (user_id, exp)
+            self._cache.move_to_end(token)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+token_verifier = TokenVerifier(SUPABASE_JWT_SECRET, SUPABASE_JWKS_URL, TOKEN_CACHE_SIZE, JWKS_REFRESH_INTERVAL)
+
 # Middleware to verify JWT
 def verify_jwt():
     auth_header = request.headers.get('Authorization')
@@ -695,11 +806,9 @@ def verify_jwt():
     token = auth_header.split(' ')[1]
     logging.debug(f"JWT Token: {token}")
     try:
-        response = supabase.auth.get_user(token)
-        logging.debug(f"Supabase get_user response: {response}")
-        if response.user:
-            return response.user.id, None
-        return None, "Invalid token or user not found"
+        return token_verifier.verify(token), None
+    except jwt.InvalidTokenError as e:
+        return None, f"Invalid token: {e}"
     except Exception as e:
         logging.error(f"JWT verification error: {str(e)}")
         return None, f"Authentication error: {str(e)}"
@@ -713,9 +822,20 @@ def check_file_size(file):
         raise ValueError(f"File size exceeds {MAX_FILE_SIZE / 1024 / 1024}MB limit")
     return file
 
-def limit_text(text: str) -> str:
-    if len(text) > MAX_TEXT_LENGTH:
-        return text[:MAX_TEXT_LENGTH]
+def upload_fileno(file):
+    # Uploads Werkzeug spooled past its in-memory limit already sit in a temp file PdfReader can map;
+    # job uploads arrive as plain BytesIO, which has no descriptor and is read as-is
+    stream = getattr(file, 'stream', file)
+    if not getattr(stream, '_rolled', True):
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def limit_text(text: str, limit: int = MAX_DOCUMENT_LENGTH) -> str:
+    if len(text) > limit:
+        return text[:limit]
     return text
 
 def validate_stt_lang(lang: str) -> str:
@@ -726,7 +846,8 @@ def validate_stt_lang(lang: str) -> str:
 def extract_text_from_pdf(file_storage) -> str:
     try:
         check_file_size(file_storage)
-        reader = PdfReader(file_storage)
+        fd = upload_fileno(file_storage)
+        reader = PdfReader(file_storage if fd is None else fd)
     except PdfReadError:
         raise ValueError("Invalid or corrupted PDF file. Please try another file.")
     if reader.is_encrypted:
@@ -734,49 +855,914 @@ def extract_text_from_pdf(file_storage) -> str:
             reader.decrypt("")
         except Exception:
             raise ValueError("This PDF is password protected and cannot be processed.")
-    text = []
-    for page in reader.pages:
-        extracted = page.extract_text()
-        if extracted:
-            text.append(extracted)
+    page_count = len(reader.pages)
+    if pdf_pool_available() and page_count >= PDF_PARALLEL_MIN_PAGES:
+        page_texts = extract_pages_parallel(file_storage, reader)
+    else:
+        page_texts = reader.iter_page_texts()
+    # Both sources are lazy, so pages past the budget are never parsed
+    with contextlib.closing(page_texts):
+        text = take_text_budget(page_texts, MAX_DOCUMENT_LENGTH)
     result = "\n".join(text).strip()
     if not result:
         raise ValueError("No readable text found in the PDF.")
     return limit_text(result)
 
-def tts_to_tempfile(text: str, lang: str) -> str:
-    text = limit_text(text)
-    tf = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    tf.close()
-    gTTS(text=text, lang=lang).save(tf.name)
-    return tf.name
+def take_text_budget(page_texts, budget: int) -> list:
+    text = []
+    total = 0
+    for extracted in page_texts:
+        if extracted:
+            text.append(extracted)
+            # Never overcounts what the page adds to the joined result, so stopping early is safe
+            total += len(extracted.strip()) + 1
+            if total > budget:
+                break
+    return text
+
+# Page extraction is pure-Python and CPU-bound, so it fans out to processes rather than threads.
+# Workers start lazily and live as long as the serving process does. They are never forked
+# straight from it: a gunicorn worker runs request threads, and a fork can copy a lock one of
+# them holds. A forkserver forks from a clean, single-threaded process that has only
+# pdf_worker preloaded.
+pdf_pool = None
+pdf_pool_lock = threading.Lock()
+
+def pdf_pool_available() -> bool:
+    return PDF_WORKERS > 1
+
+def pdf_pool_context():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['pdf_worker'])
+        return context
+    return multiprocessing.get_context('spawn')  # Windows
 
-def convert_to_wav(audio_file) -> str:
-    tf = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global pdf_pool
+    with pdf_pool_lock:
+        if pdf_pool is None:
+            pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=pdf_pool_context())
+        return pdf_pool
+
+def reset_pdf_pool(broken: ProcessPoolExecutor):
+    global pdf_pool
+    with pdf_pool_lock:
+        if pdf_pool is broken:
+            pdf_pool = None
+    broken.shutdown(wait=False)
+
+def extract_pages_parallel(file_storage, reader: PdfReader):
+    # Yields page texts in page order while keeping a bounded number of page batches in flight
+    page_count = len(reader.pages)
+    done = 0
+    file_storage.seek(0)
+    tf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+    with tf:
+        # Copies in chunks from either a FileStorage or the BytesIO a job was given
+        shutil.copyfileobj(file_storage, tf)
+    token = uuid.uuid4().hex
+    batches = iter(range(0, page_count, PDF_PAGE_BATCH))
+    pending = deque()
     try:
-        audio = AudioSegment.from_file(audio_file)
-        audio = audio.set_channels(1).set_frame_rate(16000)
-        audio.export(tf.name, format='wav')
-    except Exception as e:
+        pool = get_pdf_pool()
+        try:
+            for start in itertools.islice(batches, PDF_WORKERS * 2):
+                pending.append(pool.submit(extract_page_range, tf.name, token, start, min(start + PDF_PAGE_BATCH, page_count)))
+            while pending:
+                texts = pending.popleft().result()
+                for start in itertools.islice(batches, 1):
+                    pending.append(pool.submit(extract_page_range, tf.name, token, start, min(start + PDF_PAGE_BATCH, page_count)))
+                done += len(texts)
+                yield from texts
+        except BrokenProcessPool as e:
+            logging.error(f"PDF worker pool failed, extracting serially: {e}")
+            reset_pdf_pool(pool)
+            pending.clear()
+            yield from reader.iter_page_texts(done)
+    finally:
+        for future in pending:
+            future.cancel()
+        try:
+            os.unlink(tf.name)
+        except Exception as e:
+            logging.error(f"Failed to delete temp file {tf.name}: {e}")
+
+def tts_stream(text: str, lang: str):
+    # Yields MP3 fragments as gTTS synthesizes each part of the text
+    # Whole documents are translated, but synthesis keeps its own, smaller budget
+    text = limit_text(text, MAX_TTS_LENGTH)
+    tts = gTTS(text=text, lang=lang)
+    # _prepare_requests() is gTTS's own tokenizer + request builder (one request per <=100 chars)
+    return tts_fragments(tts, tts._prepare_requests())
+
+class FlacAudioData(sr.AudioData):
+    # 16 kHz mono FLAC straight from ffmpeg; recognize_google() only ever asks
+    # for FLAC, so this skips the bundled flac encoder entirely
+    def __init__(self, flac_data: bytes):
+        super().__init__(b'', STT_SAMPLE_RATE, 2)
+        self.flac_data = flac_data
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        return self.flac_data
+
+def run_ffmpeg(data: bytes, output_args: list) -> bytes:
+    source = 'pipe:0'
+    tmp_path = None
+    # MP4/M4A may keep its index at the end of the file, which ffmpeg can't seek to through a pipe
+    if data[4:8] == b'ftyp':
+        tf = tempfile.NamedTemporaryFile(delete=False, suffix='.m4a')
+        with tf:
+            tf.write(data)
+        source = tmp_path = tf.name
+        data = None
+    try:
+        process = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-i', source] + output_args + ['pipe:1'],
+            input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=FFMPEG_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
         raise ValueError(f"Audio conversion failed: {str(e)}")
-    return tf.name
+    finally:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except Exception as e:
+                logging.error(f"Failed to delete temp file {tmp_path}: {e}")
+    if process.returncode != 0 or not process.stdout:
+        raise ValueError(f"Audio conversion failed: {process.stderr.decode('utf-8', 'replace').strip()}")
+    return process.stdout
+
+stt_pool = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix='stt')
+
+def decode_audio(audio_file) -> AudioSegment:
+    pcm = run_ffmpeg(audio_file.read(), ['-ac', '1', '-ar', str(STT_SAMPLE_RATE), '-f', 's16le'])
+    return AudioSegment(data=pcm, sample_width=2, frame_rate=STT_SAMPLE_RATE, channels=1)
+
+def split_speech(audio: AudioSegment) -> list:
+    # Returns (start_ms, end_ms) spans of at most STT_SEGMENT_MAX_MS, cut inside pauses where possible
+    speech = detect_nonsilent(
+        audio,
+        min_silence_len=STT_MIN_SILENCE_MS,
+        silence_thresh=audio.dBFS - STT_SILENCE_OFFSET_DB,
+        seek_step=STT_SEEK_STEP_MS
+    )
+    spans = []
+    for start, end in speech:
+        if spans and end - spans[-1][0] <= STT_SEGMENT_MAX_MS:
+            spans[-1][1] = end
+            continue
+        while end - start > STT_SEGMENT_MAX_MS:
+            spans.append([start, start + STT_SEGMENT_MAX_MS])
+            start += STT_SEGMENT_MAX_MS
+        spans.append([start, end])
+    return [(max(0, start - STT_PADDING_MS), min(len(audio), end + STT_PADDING_MS)) for start, end in spans]
 
-def stt_google(audio_path: str, language: str = 'en-US') -> str:
+def encode_flac_spans(audio: AudioSegment, spans: list) -> list:
+    # One ffmpeg run encodes every span, each to its own output; spans overlap by their padding,
+    # so they are trimmed out of the decoded PCM per output rather than cut with the segment muxer
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"{i}.flac") for i in range(len(spans))]
+        args = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+                '-f', 's16le', '-ar', str(STT_SAMPLE_RATE), '-ac', '1', '-i', 'pipe:0']
+        samples_per_ms = STT_SAMPLE_RATE // 1000
+        for (start, end), path in zip(spans, paths):
+            trim = f"atrim=start_sample={start * samples_per_ms}:end_sample={end * samples_per_ms},asetpts=PTS-STARTPTS"
+            args += ['-af', trim, '-sample_fmt', 's16', '-f', 'flac', path]
+        try:
+            process = subprocess.run(
+                args, input=audio.raw_data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=FFMPEG_TIMEOUT
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ValueError(f"Audio conversion failed: {str(e)}")
+        if process.returncode != 0:
+            raise ValueError(f"Audio conversion failed: {process.stderr.decode('utf-8', 'replace').strip()}")
+        segments = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                segments.append(FlacAudioData(f.read()))
+        return segments
+
+def stt_google(audio: AudioSegment, language: str = 'en-US') -> dict:
     language = validate_stt_lang(language)
     recognizer = sr.Recognizer()
+    spans = split_speech(audio)
+    segments_audio = encode_flac_spans(audio, spans) if spans else []
+
+    def recognize(audio_data):
+        try:
+            return recognizer.recognize_google(audio_data, language=language)
+        except sr.UnknownValueError:
+            return ''
+
     try:
-        with sr.AudioFile(audio_path) as source:
-            audio_data = recognizer.record(source)
-        return recognizer.recognize_google(audio_data, language=language)
-    except sr.UnknownValueError:
-        raise ValueError("Could not understand the audio.")
+        texts = list(stt_pool.map(recognize, segments_audio))
     except sr.RequestError as e:
         raise ValueError(f"Speech service error: {e}")
+    segments = [
+        {'start': start / 1000, 'end': end / 1000, 'text': text}
+        for (start, end), text in zip(spans, texts) if text
+    ]
+    if not segments:
+        raise ValueError("Could not understand the audio.")
+    return {'text': ' '.join(segment['text'] for segment in segments), 'segments': segments}
+
+# Outbound rate limiting
+TRANSLATORS = {'google': GoogleTranslator}
+DEFAULT_TRANSLATE_RATE_LIMIT = '5:5'  # requests per second:burst, Google's documented 5 req/s
+TRANSLATE_MAX_RETRIES = int(os.getenv('TRANSLATE_MAX_RETRIES', 4))
+TRANSLATE_BACKOFF_BASE = 0.5  # Seconds, doubled on every consecutive 429
+TRANSLATE_BACKOFF_MAX = 8.0
+RATE_LIMIT_DIR = os.getenv('RATE_LIMIT_DIR', tempfile.gettempdir())
+
+class TokenBucket:
+    # State lives in a flock()ed file so every gunicorn worker on the host
+    # draws from the same bucket; without fcntl it is shared per process only
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._path = os.path.join(RATE_LIMIT_DIR, f"lingua-flow-{name}.bucket")
+        self._lock = threading.Lock()
+        self._state = [float(burst), time.time(), 0.0]  # tokens, updated_at, blocked_until
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def back_off(self, delay: float):
+        with self._locked_state() as state:
+            state[2] = max(state[2], time.time() + delay)
+
+    def _take(self) -> float:
+        with self._locked_state() as state:
+            tokens, updated_at, blocked_until = state
+            now = time.time()
+            if now < blocked_until:
+                return blocked_until - now
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                state[:] = [tokens - 1, now, blocked_until]
+                return 0
+            state[:] = [tokens, now, blocked_until]
+            return (1 - tokens) / self.rate
+
+    @contextlib.contextmanager
+    def _locked_state(self):
+        with self._lock:
+            if fcntl is None:
+                yield self._state
+                return
+            with open(self._path, 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = [float(v) for v in f.read().split()]
+                    except ValueError:
+                        state = []
+                    if len(state) != 3:
+                        state = [float(self.burst), time.time(), 0.0]
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(' '.join(repr(v) for v in state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+def translate_rate_limit(backend: str):
+    spec = os.getenv(f"TRANSLATE_RATE_LIMIT_{backend.upper()}", DEFAULT_TRANSLATE_RATE_LIMIT)
+    rate, burst = spec.split(':')
+    return float(rate), int(burst)
+
+rate_limiters = {name: TokenBucket(name, *translate_rate_limit(name)) for name in TRANSLATORS}
+
+def translate_text(text: str, target: str, backend: str = 'google') -> str:
+    limiter = rate_limiters[backend]
+    for attempt in range(TRANSLATE_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return TRANSLATORS[backend](source='auto', target=target).translate(text)
+        except TooManyRequests:
+            if attempt == TRANSLATE_MAX_RETRIES:
+                raise ValueError("Translation service is busy. Please try again later.")
+            # Full jitter, shared through the bucket so every worker pauses together
+            delay = random.uniform(0, min(TRANSLATE_BACKOFF_MAX, TRANSLATE_BACKOFF_BASE * 2 ** attempt))
+            logging.warning(f"Translator '{backend}' rate limited, backing off {delay:.2f}s (attempt {attempt + 1})")
+            limiter.back_off(delay)
+
+# Parallel TTS
+TTS_WORKERS = int(os.getenv('TTS_WORKERS', 16))  # Shared across all requests
+TTS_PARTS_IN_FLIGHT = int(os.getenv('TTS_PARTS_IN_FLIGHT', 8))  # Per stream
+TTS_TIMEOUT = 30
+TTS_AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+tts_session = requests.Session()
+tts_session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=TTS_WORKERS))
+tts_pool = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix='tts')
+
+def fetch_tts_part(tts, prepared_request) -> bytes:
+    # Same decoding as gTTS.stream(), but over the shared keep-alive session
+    response = None
+    try:
+        response = tts_session.send(prepared_request, proxies=urllib.request.getproxies(), timeout=TTS_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        raise gTTSError(tts=tts, response=response)
+    except requests.exceptions.RequestException:
+        raise gTTSError(tts=tts)
+    fragments = []
+    for line in response.iter_lines(chunk_size=1024):
+        decoded = line.decode('utf-8')
+        if tts.GOOGLE_TTS_RPC in decoded:
+            match = TTS_AUDIO_PATTERN.search(decoded)
+            if not match:
+                raise gTTSError(tts=tts, response=response)
+            fragments.append(base64.b64decode(match.group(1).encode('ascii')))
+    return b''.join(fragments)
+
+def tts_fragments(tts, prepared_requests):
+    # Keeps up to TTS_PARTS_IN_FLIGHT parts synthesizing and yields them in text order
+    remaining = iter(prepared_requests)
+    pending = deque(tts_pool.submit(fetch_tts_part, tts, pr) for pr in itertools.islice(remaining, TTS_PARTS_IN_FLIGHT))
+    try:
+        while pending:
+            fragment = pending.popleft().result()
+            next_request = next(remaining, None)
+            if next_request is not None:
+                pending.append(tts_pool.submit(fetch_tts_part, tts, next_request))
+            yield fragment
     finally:
+        for future in pending:
+            future.cancel()
+
+# Document translation
+TRANSLATE_CHUNK_SIZE = MAX_TEXT_LENGTH - 1  # The translator rejects inputs of MAX_TEXT_LENGTH chars or more
+TRANSLATE_WORKERS = int(os.getenv('TRANSLATE_WORKERS', 4))
+# Preferred break points, coarsest first: paragraphs, lines, sentences, words
+CHUNK_BREAKS = [
+    re.compile(r'\n\s*\n'),
+    re.compile(r'\n'),
+    re.compile(r'(?<=[.!?;။。！？])\s+'),
+    re.compile(r'\s+')
+]
+
+translate_pool = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix='translate')
+
+def split_text(text: str, max_chars: int, level: int = 0) -> list:
+    # Returns (chunk, separator) pairs; joining chunk + separator in order rebuilds the text
+    if len(text) <= max_chars:
+        return [(text, '')]
+    if level == len(CHUNK_BREAKS):
+        return [(text[i:i + max_chars], '') for i in range(0, len(text), max_chars)]
+    pieces = []
+    pos = 0
+    for match in CHUNK_BREAKS[level].finditer(text):
+        pieces.append((text[pos:match.start()], match.group()))
+        pos = match.end()
+    pieces.append((text[pos:], ''))
+    chunks = []
+    current, current_sep = None, ''
+    for piece, sep in pieces:
+        if len(piece) > max_chars:
+            if current is not None:
+                chunks.append((current, current_sep))
+                current = None
+            sub_chunks = split_text(piece, max_chars, level + 1)
+            chunks.extend(sub_chunks[:-1])
+            current, current_sep = sub_chunks[-1][0], sub_chunks[-1][1] + sep
+        elif current is not None and len(current) + len(current_sep) + len(piece) > max_chars:
+            chunks.append((current, current_sep))
+            current, current_sep = piece, sep
+        else:
+            current = piece if current is None else current + current_sep + piece
+            current_sep = sep
+    if current is not None:
+        chunks.append((current, current_sep))
+    return chunks
+
+def translate_document(text: str, target: str) -> str:
+    chunks = split_text(text, TRANSLATE_CHUNK_SIZE)
+    if len(chunks) == 1:
+        return translate_text(text, target)
+
+    def translate_chunk(chunk):
+        return translate_text(chunk, target) if chunk.strip() else chunk
+
+    translated = translate_pool.map(translate_chunk, [chunk for chunk, _ in chunks])
+    return ''.join(part + sep for part, (_, sep) in zip(translated, chunks))
+
+# Result cache
+RESULT_CACHE = os.getenv('RESULT_CACHE', 'disk')  # 'disk' or 'none'
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'lingua-flow-cache'))
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 7 * 24 * 3600))
+CACHE_TIERS = ('text', 'translation', 'audio')
+
+def upload_digest(upload) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: upload.read(64 * 1024), b''):
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+def cache_key(*parts: str) -> str:
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+class ResultCache:
+    # Caches nothing; subclasses override _get/_set and inherit the hit/miss counters
+    name = 'none'
+
+    def __init__(self):
+        self._stats = {tier: {'hits': 0, 'misses': 0} for tier in CACHE_TIERS}
+        self._stats_lock = threading.Lock()
+
+    def get(self, tier: str, key: str):
+        try:
+            value = self._get(tier, key)
+        except Exception as e:
+            logging.error(f"Result cache read failed ({tier}): {e}")
+            value = None
+        with self._stats_lock:
+            self._stats[tier]['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, tier: str, key: str, value: bytes):
         try:
-            os.unlink(audio_path)
+            self._set(tier, key, value)
         except Exception as e:
-            logging.error(f"Failed to delete temp file {audio_path}: {e}")
+            logging.error(f"Result cache write failed ({tier}): {e}")
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {'backend': self.name, 'tiers': {tier: dict(counts) for tier, counts in self._stats.items()}}
+
+    def _get(self, tier: str, key: str):
+        return None
+
+    def _set(self, tier: str, key: str, value: bytes):
+        pass
+
+class DiskLRUCache(ResultCache):
+    name = 'disk'
+
+    def __init__(self, directory: str, max_bytes: int, ttl: int):
+        super().__init__()
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # path -> size, least recently used first
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path, st.st_size))
+        for _, path, size in sorted(entries):
+            self._index[path] = size
+            self._size += size
+
+    def stats(self) -> dict:
+        data = super().stats()
+        with self._lock:
+            data['entries'] = len(self._index)
+            data['bytes'] = self._size
+        data['max_bytes'] = self._max_bytes
+        return data
+
+    def _path(self, tier: str, key: str) -> str:
+        return os.path.join(self._dir, f"{tier}-{key}")
+
+    def _get(self, tier: str, key: str):
+        path = self._path(tier, key)
+        with self._lock:
+            try:
+                # mtime is the write time; recency of use is tracked in the index only
+                expired = time.time() - os.stat(path).st_mtime > self._ttl
+            except FileNotFoundError:
+                self._size -= self._index.pop(path, 0)
+                return None
+            if expired:
+                self._evict(path)
+                return None
+            if path in self._index:
+                self._index.move_to_end(path)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def _set(self, tier: str, key: str, value: bytes):
+        path = self._path(tier, key)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._size -= self._index.pop(path, 0)
+            self._index[path] = len(value)
+            self._size += len(value)
+            while self._size > self._max_bytes and self._index:
+                self._evict(next(iter(self._index)))
+
+    def _evict(self, path: str):
+        self._size -= self._index.pop(path, 0)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+def create_result_cache(backend: str) -> ResultCache:
+    if backend == 'disk':
+        return DiskLRUCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL)
+    if backend == 'none':
+        return ResultCache()
+    raise ValueError(f"Unknown RESULT_CACHE backend: {backend}")
+
+result_cache = create_result_cache(RESULT_CACHE)
+
+def cached_text(tier: str, key: str, compute) -> str:
+    value = result_cache.get(tier, key)
+    if value is not None:
+        return value.decode('utf-8')
+    text = compute()
+    result_cache.set(tier, key, text.encode('utf-8'))
+    return text
+
+def cached_json(tier: str, key: str, compute) -> dict:
+    return json.loads(cached_text(tier, key, lambda: json.dumps(compute())))
+
+# History writer
+HISTORY_BATCH_SIZE = int(os.getenv('HISTORY_BATCH_SIZE', 50))
+HISTORY_FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL', 2))  # Max seconds a row waits before it is sent
+HISTORY_QUEUE_SIZE = int(os.getenv('HISTORY_QUEUE_SIZE', 10000))
+HISTORY_RETRY_INTERVAL = 30  # Seconds between attempts to replay the spool after a failure
+HISTORY_SPOOL_PATH = os.getenv('HISTORY_SPOOL_PATH', os.path.join(tempfile.gettempdir(), 'lingua-flow-history.jsonl'))
+
+class HistoryWriter:
+    # Rows are inserted in batches from a background thread; anything that
+    # can't be inserted goes to a JSON-lines spool and is retried later
+    def __init__(self, batch_size: int, flush_interval: float, queue_size: int, spool_path: str):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._spool_path = spool_path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spool_lock = threading.Lock()
+        self._retry_at = 0
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, row: dict):
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            logging.warning("History queue is full, spooling row to disk")
+            self._spool([row])
+
+    def close(self):
+        self._stopping.set()
+        self._thread.join(timeout=self._flush_interval + 5)
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if rows:
+            self._flush(rows)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                batch = self._next_batch()
+                if batch:
+                    self._flush(batch)
+                if time.monotonic() >= self._retry_at:
+                    self._replay_spool()
+            except Exception as e:
+                # Keep the thread alive, otherwise rows would pile up in the queue unwritten
+                logging.error(f"History writer error: {str(e)}")
+                self._retry_at = time.monotonic() + HISTORY_RETRY_INTERVAL
+
+    def _next_batch(self) -> list:
+        batch = []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, rows: list):
+        supabase.table('history').insert(rows).execute()
+
+    def _flush(self, rows: list):
+        try:
+            self._insert(rows)
+        except Exception as e:
+            logging.error(f"History insert of {len(rows)} rows failed, spooling to disk: {e}")
+            self._spool(rows)
+            self._retry_at = time.monotonic() + HISTORY_RETRY_INTERVAL
+
+    def _spool(self, rows: list):
+        with self._spool_lock:
+            with open(self._spool_path, 'a', encoding='utf-8') as f:
+                for row in rows:
+                    try:
+                        line = json.dumps(row)
+                    except (TypeError, ValueError) as e:
+                        logging.error(f"Dropping history row that can't be spooled: {str(e)}")
+                        continue
+                    f.write(line + '\n')
+
+    def _replay_spool(self):
+        claimed_path = f"{self._spool_path}.{os.getpid()}.replay"
+        # A claimed spool left behind by a failed replay is retried before claiming a new one
+        if not os.path.exists(claimed_path):
+            with self._spool_lock:
+                try:
+                    # Renaming claims the spool, so rows spooled meanwhile land in a fresh file
+                    os.replace(self._spool_path, claimed_path)
+                except FileNotFoundError:
+                    return
+        rows = self._read_spool(claimed_path)
+        logging.info(f"Replaying {len(rows)} spooled history rows")
+        for start in range(0, len(rows), self._batch_size):
+            try:
+                self._insert(rows[start:start + self._batch_size])
+            except Exception as e:
+                logging.error(f"History spool replay failed: {e}")
+                self._spool(rows[start:])
+                self._retry_at = time.monotonic() + HISTORY_RETRY_INTERVAL
+                break
+        os.unlink(claimed_path)
+
+    def _read_spool(self, path: str) -> list:
+        rows = []
+        malformed = []
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                if isinstance(row, dict):
+                    rows.append(row)
+                else:
+                    malformed.append(line)
+        if malformed:
+            # Set aside rather than dropped or retried forever
+            quarantine_path = f"{self._spool_path}.bad"
+            logging.error(f"Moving {len(malformed)} malformed spooled history rows to {quarantine_path}")
+            with open(quarantine_path, 'a', encoding='utf-8') as f:
+                f.writelines(line if line.endswith('\n') else line + '\n' for line in malformed)
+        return rows
+
+history_writer = HistoryWriter(HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_QUEUE_SIZE, HISTORY_SPOOL_PATH)
+
+# Pipeline
+PDF_MODES = ('pdf_audio', 'pdf_translate', 'pdf_translate_audio')
+AUDIO_MODES = ('audio_text', 'audio_translate', 'audio_audio')
+TRANSLATE_MODES = ('pdf_translate', 'pdf_translate_audio', 'audio_translate', 'audio_audio')
+AUDIO_DOWNLOAD_NAMES = {
+    'pdf_audio': 'audiobook.mp3',
+    'pdf_translate_audio': 'translated_audiobook.mp3',
+    'audio_audio': 'translated_audio.mp3'
+}
+
+def cache_fragments(tier: str, key: str, fragments):
+    # Passes fragments through and caches the joined bytes once the stream completes
+    parts = []
+    for fragment in fragments:
+        parts.append(fragment)
+        yield fragment
+    result_cache.set(tier, key, b''.join(parts))
+
+def transcribe(upload, stt_lang: str) -> dict:
+    return stt_google(decode_audio(upload), language=stt_lang)
+
+def run_pipeline(mode: str, upload, lang: str = 'en', stt_lang: str = 'en-US') -> dict:
+    check_file_size(upload)
+    # Each tier is keyed on what it depends on, so e.g. a translation is shared
+    # between pdf_translate and pdf_translate_audio for the same upload
+    source = f"stt:{stt_lang}" if mode in AUDIO_MODES else 'pdf'
+    text_key = cache_key(upload_digest(upload), source)
+    translation_key = cache_key(text_key, lang)
+    audio_key = cache_key(text_key, mode, lang, str(MAX_TTS_LENGTH))
+    if mode in AUDIO_DOWNLOAD_NAMES:
+        audio = result_cache.get('audio', audio_key)
+        if audio is not None:
+            return {'audio': [audio]}
+    result = {}
+    if mode in PDF_MODES:
+        text = cached_text('text', text_key, lambda: extract_text_from_pdf(upload))
+    else:
+        transcript = cached_json('text', text_key, lambda: transcribe(upload, stt_lang))
+        text = transcript['text']
+        result['text'] = text
+        result['segments'] = transcript['segments']
+    if mode in TRANSLATE_MODES:
+        text = cached_text('translation', translation_key, lambda: translate_document(text, lang))
+        result['translated_text'] = text
+    if mode in AUDIO_DOWNLOAD_NAMES:
+        result['audio'] = cache_fragments('audio', audio_key, tts_stream(text, lang))
+    return result
+
+def record_history(user_id, mode: str, input_file: str, result: dict, lang: str = None, stt_lang: str = None):
+    if 'audio' in result:
+        output = 'Audio output'
+    else:
+        output = result.get('translated_text', result.get('text'))
+    row = {
+        'user_id': user_id,
+        'mode': mode,
+        'input_file': input_file,
+        'output_result': output
+    }
+    if lang:
+        row['target_language'] = lang
+    if stt_lang:
+        row['stt_language'] = stt_lang
+    history_writer.write(row)
+
+def send_audio(audio, download_name: str):
+    return send_file(audio, mimetype='audio/mpeg', as_attachment=True, download_name=download_name)
+
+def stream_audio(fragments, download_name: str):
+    fragments = iter(fragments)
+    # Pull the first fragment before responding so TTS failures still become a 400
+    first = next(fragments, b'')
+
+    def generate():
+        yield first
+        try:
+            yield from fragments
+        except Exception as e:
+            logging.error(f"Audio stream for {download_name} aborted: {e}")
+            raise
+
+    return Response(generate(), mimetype='audio/mpeg', headers={
+        'Content-Disposition': f'attachment; filename={download_name}'
+    })
+
+# Background jobs
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 200))
+JOB_TTL = int(os.getenv('JOB_TTL', 3600))  # Seconds a finished job is kept
+JOB_MAX_WAIT = 30  # Max seconds a long-poll may block, well under the gunicorn timeout
+JOB_SPOOL_DIR = os.getenv('JOB_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'lingua-flow-jobs'))  # Queued uploads and audio results
+JOB_PURGE_INTERVAL = 60  # Seconds between sweeps for expired jobs
+
+class JobQueueFull(Exception):
+    pass
+
+class Job:
+    def __init__(self, user_id, mode: str, filename: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.mode = mode
+        self.filename = filename
+        self.status = 'queued'
+        self.result = None
+        self.audio_path = None
+        self.error = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        data = {'job_id': self.id, 'mode': self.mode, 'status': self.status}
+        if self.status == 'done':
+            data['result'] = dict(self.result)
+            if self.audio_path:
+                data['result']['audio_url'] = f"/jobs/{self.id}/audio"
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+class JobManager:
+    # Job state lives in this process, so the app must run as a single (threaded) gunicorn
+    # worker; another worker would answer 404 for jobs it didn't create.
+    # Uploads and audio results are spooled to spool_dir so queued and finished jobs hold no payloads in memory.
+    def __init__(self, max_workers: int, max_pending: int, ttl: int, spool_dir: str, purge_interval: float):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._spool_dir = spool_dir
+        self._purge_interval = purge_interval
+        os.makedirs(spool_dir, exist_ok=True)
+        self._purger = threading.Thread(target=self._purge_periodically, name='job-purger', daemon=True)
+        self._purger.start()
+
+    def spool_upload(self, upload):
+        # Anonymous temp file: removed by the OS once the job closes it, even if the process dies
+        spooled = tempfile.TemporaryFile(dir=self._spool_dir)
+        try:
+            shutil.copyfileobj(upload, spooled)
+            spooled.seek(0)
+        except Exception:
+            spooled.close()
+            raise
+        return spooled
+
+    def submit(self, user_id, mode: str, filename: str, upload, lang: str, stt_lang: str) -> Job:
+        self._purge_expired()
+        if not self._slots.acquire(blocking=False):
+            upload.close()
+            raise JobQueueFull("Too many pending jobs. Please try again later.")
+        job = Job(user_id, mode, filename)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, upload, lang, stt_lang)
+        return job
+
+    def get(self, job_id: str):
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, upload, lang: str, stt_lang: str):
+        job.status = 'running'
+        try:
+            result = run_pipeline(job.mode, upload, lang=lang, stt_lang=stt_lang)
+            if 'audio' in result:
+                job.audio_path = self._spool_audio(job, result.pop('audio'))
+            job.result = result
+            record_history(
+                job.user_id, job.mode, job.filename, job.result,
+                lang=lang if job.mode != 'audio_text' else None,
+                stt_lang=stt_lang if job.mode in AUDIO_MODES else None
+            )
+            job.status = 'done'
+        except Exception as e:
+            logging.error(f"Job {job.id} ({job.mode}) failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            upload.close()
+            job.finished_at = time.time()
+            self._slots.release()
+            job.done.set()
+
+    def _spool_audio(self, job: Job, fragments) -> str:
+        path = os.path.join(self._spool_dir, f"{job.id}.mp3")
+        try:
+            with open(path, 'wb') as f:
+                for fragment in fragments:
+                    f.write(fragment)
+        except Exception:
+            self._remove(path)
+            raise
+        return path
+
+    def _purge_periodically(self):
+        while True:
+            time.sleep(self._purge_interval)
+            try:
+                self._purge_expired()
+            except Exception as e:
+                logging.error(f"Job purge failed: {str(e)}")
+
+    def _purge_expired(self):
+        cutoff = time.time() - self._ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            expired_jobs = [self._jobs.pop(job_id) for job_id in expired]
+        for job in expired_jobs:
+            if job.audio_path:
+                self._remove(job.audio_path)
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Failed to delete job file {path}: {e}")
+
+jobs = JobManager(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TTL, JOB_SPOOL_DIR, JOB_PURGE_INTERVAL)
 
 # Routes
 @app.route('/')
@@ -792,30 +1778,16 @@ def pdf_to_audio():
     user_id, error = verify_jwt()
     if error:
         return jsonify({"error": error}), 401
-    mp3_path = None
     try:
         pdf = request.files.get('pdf')
         lang = request.form.get('lang', 'en')
         if not pdf:
             return jsonify({"error": "No PDF uploaded"}), 400
-        text = extract_text_from_pdf(pdf)
-        mp3_path = tts_to_tempfile(text, lang)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'pdf_audio',
-            'input_file': pdf.filename,
-            'output_result': 'Audio output',
-            'target_language': lang
-        }).execute()
-        return send_file(mp3_path, mimetype='audio/mpeg', as_attachment=True, download_name='audiobook.mp3')
+        result = run_pipeline('pdf_audio', pdf, lang=lang)
+        record_history(user_id, 'pdf_audio', pdf.filename, result, lang=lang)
+        return stream_audio(result['audio'], 'audiobook.mp3')
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        if mp3_path:
-            try:
-                os.unlink(mp3_path)
-            except Exception as e:
-                logging.error(f"Failed to delete temp file {mp3_path}: {e}")
 
 @app.route('/pdf-to-translate', methods=['POST'])
 def pdf_to_translate():
@@ -827,17 +1799,9 @@ def pdf_to_translate():
         target = request.form.get('lang', 'en')
         if not pdf:
             return jsonify({"error": "No PDF uploaded"}), 400
-        text = extract_text_from_pdf(pdf)
-        translated = GoogleTranslator(source='auto', target=target).translate(text)
-        time.sleep(0.2)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'pdf_translate',
-            'input_file': pdf.filename,
-            'output_result': translated,
-            'target_language': target
-        }).execute()
-        return jsonify({"translated_text": translated})
+        result = run_pipeline('pdf_translate', pdf, lang=target)
+        record_history(user_id, 'pdf_translate', pdf.filename, result, lang=target)
+        return jsonify({"translated_text": result['translated_text']})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -846,32 +1810,16 @@ def pdf_to_translate_audio():
     user_id, error = verify_jwt()
     if error:
         return jsonify({"error": error}), 401
-    mp3_path = None
     try:
         pdf = request.files.get('pdf')
         target = request.form.get('lang', 'en')
         if not pdf:
             return jsonify({"error": "No PDF uploaded"}), 400
-        text = extract_text_from_pdf(pdf)
-        translated = GoogleTranslator(source='auto', target=target).translate(text)
-        time.sleep(0.2)
-        mp3_path = tts_to_tempfile(translated, target)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'pdf_translate_audio',
-            'input_file': pdf.filename,
-            'output_result': 'Audio output',
-            'target_language': target
-        }).execute()
-        return send_file(mp3_path, mimetype='audio/mpeg', as_attachment=True, download_name='translated_audiobook.mp3')
+        result = run_pipeline('pdf_translate_audio', pdf, lang=target)
+        record_history(user_id, 'pdf_translate_audio', pdf.filename, result, lang=target)
+        return stream_audio(result['audio'], 'translated_audiobook.mp3')
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        if mp3_path:
-            try:
-                os.unlink(mp3_path)
-            except Exception as e:
-                logging.error(f"Failed to delete temp file {mp3_path}: {e}")
 
 @app.route('/audio-to-text', methods=['POST'])
 def audio_to_text():
@@ -883,17 +1831,9 @@ def audio_to_text():
         stt_lang = request.form.get('stt_lang', 'en-US')
         if not audio:
             return jsonify({"error": "No audio uploaded"}), 400
-        check_file_size(audio)
-        wav_path = convert_to_wav(audio)
-        text = stt_google(wav_path, language=stt_lang)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'audio_text',
-            'input_file': audio.filename,
-            'output_result': text,
-            'stt_language': stt_lang
-        }).execute()
-        return jsonify({"text": text})
+        result = run_pipeline('audio_text', audio, stt_lang=stt_lang)
+        record_history(user_id, 'audio_text', audio.filename, result, stt_lang=stt_lang)
+        return jsonify({"text": result['text'], "segments": result['segments']})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -908,20 +1848,9 @@ def audio_to_translate():
         target = request.form.get('lang', 'en')
         if not audio:
             return jsonify({"error": "No audio uploaded"}), 400
-        check_file_size(audio)
-        wav_path = convert_to_wav(audio)
-        text = stt_google(wav_path, language=stt_lang)
-        translated = GoogleTranslator(source='auto', target=target).translate(text)
-        time.sleep(0.2)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'audio_translate',
-            'input_file': audio.filename,
-            'output_result': translated,
-            'target_language': target,
-            'stt_language': stt_lang
-        }).execute()
-        return jsonify({"text": text, "translated_text": translated})
+        result = run_pipeline('audio_translate', audio, lang=target, stt_lang=stt_lang)
+        record_history(user_id, 'audio_translate', audio.filename, result, lang=target, stt_lang=stt_lang)
+        return jsonify({"text": result['text'], "translated_text": result['translated_text']})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -930,36 +1859,76 @@ def audio_to_audio():
     user_id, error = verify_jwt()
     if error:
         return jsonify({"error": error}), 401
-    mp3_path = None
     try:
         audio = request.files.get('audio')
         stt_lang = request.form.get('stt_lang', 'en-US')
         target_lang = request.form.get('lang', 'en')
         if not audio:
             return jsonify({"error": "No audio uploaded"}), 400
-        check_file_size(audio)
-        wav_path = convert_to_wav(audio)
-        text = stt_google(wav_path, language=stt_lang)
-        translated = GoogleTranslator(source='auto', target=target_lang).translate(text)
-        time.sleep(0.2)
-        mp3_path = tts_to_tempfile(translated, target_lang)
-        supabase.table('history').insert({
-            'user_id': user_id,
-            'mode': 'audio_audio',
-            'input_file': audio.filename,
-            'output_result': 'Audio output',
-            'target_language': target_lang,
-            'stt_language': stt_lang
-        }).execute()
-        return send_file(mp3_path, mimetype='audio/mpeg', as_attachment=True, download_name='translated_audio.mp3')
+        result = run_pipeline('audio_audio', audio, lang=target_lang, stt_lang=stt_lang)
+        record_history(user_id, 'audio_audio', audio.filename, result, lang=target_lang, stt_lang=stt_lang)
+        return stream_audio(result['audio'], 'translated_audio.mp3')
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        if mp3_path:
-            try:
-                os.unlink(mp3_path)
-            except Exception as e:
-                logging.error(f"Failed to delete temp file {mp3_path}: {e}")
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    user_id, error = verify_jwt()
+    if error:
+        return jsonify({"error": error}), 401
+    try:
+        mode = request.form.get('mode')
+        if mode not in PDF_MODES and mode not in AUDIO_MODES:
+            return jsonify({"error": f"Invalid mode: {mode}"}), 400
+        if mode in PDF_MODES:
+            upload = request.files.get('pdf')
+            if not upload:
+                return jsonify({"error": "No PDF uploaded"}), 400
+        else:
+            upload = request.files.get('audio')
+            if not upload:
+                return jsonify({"error": "No audio uploaded"}), 400
+        lang = request.form.get('lang', 'en')
+        stt_lang = request.form.get('stt_lang', 'en-US')
+        check_file_size(upload)
+        # The upload stream is closed once this request ends, so hand the worker its own copy on disk
+        data = jobs.spool_upload(upload)
+        job = jobs.submit(user_id, mode, upload.filename, data, lang, stt_lang)
+        return jsonify(job.to_dict()), 202, {'Location': f"/jobs/{job.id}"}
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    user_id, error = verify_jwt()
+    if error:
+        return jsonify({"error": error}), 401
+    job = jobs.get(job_id)
+    if not job or job.user_id != user_id:
+        return jsonify({"error": "Job not found"}), 404
+    wait = request.args.get('wait', 0, type=float)
+    if wait > 0:
+        job.done.wait(min(wait, JOB_MAX_WAIT))
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/audio', methods=['GET'])
+def get_job_audio(job_id):
+    user_id, error = verify_jwt()
+    if error:
+        return jsonify({"error": error}), 401
+    job = jobs.get(job_id)
+    if not job or job.user_id != user_id:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != 'done' or not job.audio_path:
+        return jsonify({"error": "Job has no audio result"}), 409
+    try:
+        # Opened here, so a purge that runs while the file is sent can't cut the download short
+        audio = open(job.audio_path, 'rb')
+    except FileNotFoundError:
+        return jsonify({"error": "Job not found"}), 404
+    return send_audio(audio, AUDIO_DOWNLOAD_NAMES[job.mode])
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
@@ -0,0 +1,24 @@
+# Runs inside the app's PDF extraction pool. Kept apart from app.py so worker
+# processes import PyPDF2 only, not the Flask app and its clients and threads.
+from PyPDF2 import PdfReader
+
+# Per-process: (upload token, PdfReader) for the document this worker last opened
+pdf_worker_document = None
+
+def open_worker_document(path: str, token: str) -> PdfReader:
+    global pdf_worker_document
+    if pdf_worker_document is not None and pdf_worker_document[0] == token:
+        return pdf_worker_document[1]
+    if pdf_worker_document is not None:
+        pdf_worker_document[1].stream.close()
+        pdf_worker_document = None
+    # PdfReader maps the shared copy of the upload, so every worker reads the same page cache
+    reader = PdfReader(path)
+    if reader.is_encrypted:
+        reader.decrypt("")
+    pdf_worker_document = (token, reader)
+    return reader
+
+def extract_page_range(path: str, token: str, start: int, stop: int) -> list:
+    # Consecutive batches of one upload reuse the parsed xref table
+    return list(open_worker_document(path, token).iter_page_texts(start, stop))